@@ -0,0 +1,79 @@
+"""Synthetic markdown documents of configurable size and shape"""
+import random
+import typing as _
+
+__all__ = ('SHAPES', 'generate')
+
+WORDS = (
+    'lorem ipsum dolor sit amet consectetur adipiscing elit sed do eiusmod tempor incididunt ut labore et dolore '
+    'magna aliqua enim ad minim veniam quis nostrud exercitation ullamco laboris nisi aliquip ex ea commodo'
+).split()
+
+
+def _sentence(rnd: random.Random, size: int = 12) -> str:
+    return ' '.join(rnd.choice(WORDS) for _ in range(size)).capitalize() + '.'
+
+
+def _paragraph(rnd: random.Random, sentences: int = 5) -> str:
+    return ' '.join(_sentence(rnd, rnd.randint(6, 18)) for _ in range(sentences))
+
+
+def paragraphs(rnd: random.Random, size: int) -> _.Iterator[str]:
+    for i in range(size):
+        if i % 10 == 0:
+            yield f'## Section {i // 10} {{: .subtitle}}'
+        yield _paragraph(rnd)
+
+
+def lists(rnd: random.Random, size: int) -> _.Iterator[str]:
+    for _i in range(size):
+        yield _sentence(rnd, 6)
+        yield '\n'.join(f'* {_sentence(rnd, 8)}' for _ in range(rnd.randint(3, 8)))
+
+
+def tables(rnd: random.Random, size: int) -> _.Iterator[str]:
+    for _i in range(size):
+        rows = [' | '.join(rnd.choice(WORDS) for _ in range(4)) for _ in range(10)]
+        yield '\n'.join([' | '.join(f'Column {c}' for c in range(4)), ' | '.join(['---'] * 4), *rows])
+
+
+def key_values(rnd: random.Random, size: int) -> _.Iterator[str]:
+    for _i in range(size):
+        yield f'{rnd.choice(WORDS)}: {_sentence(rnd, 6)}\n{{: .key-value style="bold" }}'
+        yield '\n'.join(f'* {rnd.choice(WORDS)}: {_sentence(rnd, 4)}' for _ in range(4)) + '\n{: .key-value}'
+
+
+def columns(rnd: random.Random, size: int) -> _.Iterator[str]:
+    for _i in range(size):
+        yield f'{rnd.choice(WORDS)}#{rnd.choice(WORDS)}#{rnd.choice(WORDS)}\n{{: .3-columns size=73}}'
+
+
+def keep_together(rnd: random.Random, size: int, depth: int = 5) -> _.Iterator[str]:
+    for i in range(size):
+        yield f'## Group {i} {{: .subtitle .keep-together}}'
+        for _ in range(depth - 1):
+            yield f'{_sentence(rnd)}\n{{: .keep-together}}'
+        yield _paragraph(rnd)
+
+
+def mixed(rnd: random.Random, size: int) -> _.Iterator[str]:
+    shapes = [paragraphs, lists, tables, key_values, columns, keep_together]
+    for i in range(size):
+        yield from shapes[i % len(shapes)](rnd, 1)
+
+
+SHAPES: dict[str, _.Callable[[random.Random, int], _.Iterator[str]]] = {
+    'paragraphs': paragraphs,
+    'lists': lists,
+    'tables': tables,
+    'key_values': key_values,
+    'columns': columns,
+    'keep_together': keep_together,
+    'mixed': mixed,
+}
+
+
+def generate(shape: str, size: int, seed: int = 0) -> str:
+    """Markdown document of `size` blocks of the shape, the same seed gives the same document"""
+    rnd = random.Random(seed)
+    return f'# Benchmark {shape} {{: #title}}\n\n' + '\n\n'.join(SHAPES[shape](rnd, size)) + '\n'
@@ -0,0 +1,50 @@
+"""Measure the time to import the package in a new interpreter and write the results as json.
+
+    python benchmarks/import_time.py --output import.json
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+from time import perf_counter
+
+STATEMENTS = {
+    'package': 'import md2pdf',
+    'config': 'from md2pdf import loads_config',
+    'generator': 'from md2pdf import Md2Pdf',
+}
+
+
+def measure(statement: str, repeat: int) -> dict:
+    env = {**os.environ, 'PYTHONPATH': os.pathsep.join(sys.path)}
+    baseline, timings = [], []
+
+    for _i in range(repeat):
+        for code, results in (('pass', baseline), (statement, timings)):
+            start = perf_counter()
+            subprocess.run([sys.executable, '-c', code], check=True, env=env)
+            results.append(perf_counter() - start)
+
+    return {'statement': statement, 'seconds': statistics.median(timings) - statistics.median(baseline)}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=10)
+    parser.add_argument('--output', type=Path)
+    args = parser.parse_args()
+
+    results = {}
+    for name, statement in STATEMENTS.items():
+        results[name] = measure(statement, args.repeat)
+        print(f'{name:>10}: {results[name]["seconds"] * 1000:8.1f}ms  {statement}')
+
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
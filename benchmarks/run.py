@@ -0,0 +1,106 @@
+"""Measure the conversion of the synthetic documents and write the results as json.
+
+    python benchmarks/run.py --sizes 100 1000 --output results.json
+    python benchmarks/run.py --compare before.json results.json
+"""
+import argparse
+import json
+import platform
+import resource
+import sys
+import typing as _
+from multiprocessing import get_context
+from pathlib import Path
+from time import perf_counter
+
+from documents import SHAPES, generate
+
+ROOT_DIR = Path(__file__).parent.parent
+SAMPLE_DIR = ROOT_DIR / 'sample'
+
+
+def _peak_rss() -> int:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on linux, bytes on macos
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def run_case(shape: str, size: int, direct: bool, stream: bool, repeat: int) -> dict:
+    """Run in a new process, so the peak rss is the one of this case"""
+    from md2pdf import Md2Pdf, loads_config  # pylint: disable=import-outside-toplevel
+
+    config = loads_config((SAMPLE_DIR / 'config.toml').read_text())
+    text = generate(shape, size)
+    best: dict[str, _.Any] = {}
+
+    for _i in range(repeat):
+        start = perf_counter()
+        doc = Md2Pdf(direct=direct, stream=stream).setup(config, SAMPLE_DIR).instrument()
+        data = doc.build_from_md(text).render_bytes()
+        seconds = perf_counter() - start
+
+        if not best or seconds < best['seconds']:
+            report = doc.report()
+            pages = report['counters'].get('pages', 0)
+            best = {
+                'seconds': seconds,
+                'pages': pages,
+                'pages_per_second': pages / seconds,
+                'bytes': len(data),
+                'stages': report['stages'],
+                'counters': report['counters'],
+            }
+
+    return {'shape': shape, 'size': size, 'direct': direct, 'stream': stream, **best, 'peak_rss': _peak_rss()}
+
+
+def run(shapes: list[str], sizes: list[int], direct: bool, stream: bool, repeat: int) -> dict:
+    from md2pdf.fingerprint import library_version  # pylint: disable=import-outside-toplevel
+
+    results = []
+    ctx = get_context('spawn')
+    for shape in shapes:
+        for size in sizes:
+            with ctx.Pool(1) as pool:
+                result = pool.apply(run_case, (shape, size, direct, stream, repeat))
+            print(f'{shape:>14} {size:>6}: {result["seconds"]:8.3f}s {result["pages_per_second"]:8.1f} pages/s')
+            results.append(result)
+
+    return {'version': library_version(), 'python': platform.python_version(), 'results': results}
+
+
+def compare(before: dict, after: dict) -> None:
+    def key(r: dict) -> tuple:
+        return r['shape'], r['size'], r['direct'], r['stream']
+
+    old = {key(r): r for r in before['results']}
+    for result in after['results']:
+        if (prev := old.get(key(result))) is not None:
+            change = result['seconds'] / prev['seconds'] - 1
+            seconds = f'{prev["seconds"]:8.3f}s -> {result["seconds"]:8.3f}s ({change:+.1%})'
+            print(f'{result["shape"]:>14} {result["size"]:>6}: {seconds}')
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--shapes', nargs='+', choices=sorted(SHAPES), default=sorted(SHAPES))
+    parser.add_argument('--sizes', nargs='+', type=int, default=[100])
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--direct', action='store_true')
+    parser.add_argument('--stream', action='store_true')
+    parser.add_argument('--output', type=Path)
+    parser.add_argument('--compare', nargs=2, type=Path, metavar=('BEFORE', 'AFTER'))
+    args = parser.parse_args()
+
+    if args.compare:
+        before, after = (json.loads(p.read_text()) for p in args.compare)
+        return compare(before, after)
+
+    results = run(args.shapes, args.sizes, args.direct, args.stream, args.repeat)
+
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
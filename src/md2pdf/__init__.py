@@ -1,2 +1,18 @@
-from .document import Md2Pdf
+import typing as _
+
 from .config import loads_config, load_config
+
+if _.TYPE_CHECKING:  # pragma: no cover
+    from .document import Md2Pdf
+
+__all__ = ('Md2Pdf', 'loads_config', 'load_config')
+
+
+def __getattr__(name: str) -> _.Any:
+    # reportlab, markdown and jinja are only imported when the generator is needed
+    if name == 'Md2Pdf':
+        from .document import Md2Pdf  # pylint: disable=import-outside-toplevel,redefined-outer-name
+
+        return Md2Pdf
+
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
@@ -0,0 +1,114 @@
+import json
+import pickle
+import typing as _
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from time import perf_counter
+
+from .manifest import BuildManifest, config_digest
+
+if _.TYPE_CHECKING:  # pragma: no cover
+    from .document import Md2Pdf
+
+__all__ = ('BuildResult', 'build_many')
+
+
+class BuildResult(_.NamedTuple):
+    source: Path
+    output: Path
+    seconds: float
+    error: str | None = None
+    skipped: bool = False
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+# the document configured by the worker initializer, once per process
+_WORKER: 'Md2Pdf | None' = None
+
+
+def _init_worker(state: bytes) -> None:
+    global _WORKER  # pylint: disable=global-statement
+    _WORKER = pickle.loads(state)
+
+
+def _build(doc: 'Md2Pdf', source: Path, output: Path, meta: dict) -> BuildResult:
+    start = perf_counter()
+    try:
+        doc.spawn().build_from_file(source).save(output, **meta)
+    except Exception as exc:  # pylint: disable=broad-exception-caught
+        return BuildResult(source, output, perf_counter() - start, f'{exc.__class__.__name__}: {exc}')
+
+    return BuildResult(source, output, perf_counter() - start)
+
+
+def _build_in_worker(source: Path, output: Path, meta: dict) -> BuildResult:
+    assert _WORKER is not None
+    return _build(_WORKER, source, output, meta)
+
+
+def _run(doc: 'Md2Pdf', jobs: list[tuple[Path, Path, dict]], workers: int | None) -> list[BuildResult]:
+    if workers == 1 or not jobs:
+        return [_build(doc, *job) for job in jobs]
+
+    # the document is pickled whatever the start method of the processes, so the workers get the same settings
+    initargs = (pickle.dumps(doc),)
+    with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=initargs) as pool:
+        futures = [pool.submit(_build_in_worker, *job) for job in jobs]
+
+    results = []
+    for (source, output, _meta), future in zip(jobs, futures):
+        if (exc := future.exception()) is not None:
+            results.append(BuildResult(source, output, 0.0, f'{exc.__class__.__name__}: {exc}'))
+        else:
+            results.append(future.result())
+
+    return results
+
+
+def build_many(
+    doc: 'Md2Pdf',
+    files: _.Iterable[Path | str],
+    out_dir: Path | str,
+    workers: int | None = None,
+    manifest: Path | str | None = None,
+    **meta,
+) -> list[BuildResult]:
+    """Build each markdown file to `out_dir/<name>.pdf`, the results keep the order of the files.
+
+    A failing file is reported in its result and does not stop the others.
+    With `workers=1` everything runs in the current process, otherwise the document is pickled to the workers
+    with its styles, fonts, caches and handlers, so the handlers must be importable functions.
+    With a `manifest` file, the outputs whose inputs did not change are skipped.
+    Raises ValueError when two files have the same name, the second output would overwrite the first.
+    """
+    jobs = [(Path(f), Path(out_dir) / f'{Path(f).stem}.pdf', meta) for f in files]
+
+    sources: dict[Path, Path] = {}
+    for source, output, _meta in jobs:
+        if output in sources:
+            raise ValueError(f'Files {sources[output]!s} and {source!s} have the same output {output!s}.')
+        sources[output] = source
+
+    if manifest is None:
+        return _run(doc, jobs, workers)
+
+    build_manifest = BuildManifest(manifest)
+    base = config_digest(doc.config, doc.root_dir) + json.dumps([doc.direct, meta], sort_keys=True, default=str)
+
+    digests: dict[Path, str] = {}
+    for source, output, _meta in jobs:
+        if source.is_file():
+            digests[output] = build_manifest.digest(source, base)
+
+    todo = [job for job in jobs if not build_manifest.is_current(job[1], digests.get(job[1], ''))]
+    built = {r.source: r for r in _run(doc, todo, workers)}
+
+    for result in built.values():
+        if result.ok:
+            build_manifest.update(result.output, digests[result.output])
+    build_manifest.save()
+
+    return [built.get(source) or BuildResult(source, output, 0.0, skipped=True) for source, output, _meta in jobs]
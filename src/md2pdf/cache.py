@@ -0,0 +1,97 @@
+import json
+import os
+import tempfile
+import typing as _
+from hashlib import blake2b
+from pathlib import Path
+from threading import Lock
+
+from .lru import CacheInfo
+
+__all__ = ('StageCache',)
+
+
+class StageCache:
+    """On disk cache of the intermediate stages, one json file per entry named by the hash of its key.
+
+    When the files go over `max_bytes`, the least recently used ones are removed.
+    """
+
+    def __init__(self, directory: Path | str, max_bytes: int = 64 * 1024 * 1024) -> None:
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._size = sum(f.stat().st_size for f in self._files())
+        self._lock = Lock()
+
+    def __getstate__(self) -> dict:
+        return {k: v for k, v in vars(self).items() if k not in ('hits', 'misses', '_lock')}
+
+    def __setstate__(self, state: dict) -> None:
+        vars(self).update(state)
+        self.hits = self.misses = 0
+        self._lock = Lock()
+
+    def _files(self) -> list[Path]:
+        return list(self.directory.glob('*.json'))
+
+    def _path(self, stage: str, key: str) -> Path:
+        digest = blake2b(f'{stage}\0{key}'.encode(), digest_size=20).hexdigest()
+        return self.directory / f'{stage}-{digest}.json'
+
+    def get(self, stage: str, key: str) -> _.Any:
+        """The value stored for the key, or None"""
+        path = self._path(stage, key)
+
+        try:
+            value = json.loads(path.read_bytes())
+            os.utime(path)
+        except (OSError, ValueError):
+            with self._lock:
+                self.misses += 1
+            return None
+
+        with self._lock:
+            self.hits += 1
+        return value
+
+    def set(self, stage: str, key: str, value: _.Any) -> None:
+        path = self._path(stage, key)
+        data = json.dumps(value).encode()
+        # one temporary file per writer, the last one replaced wins
+        fd, tmp = tempfile.mkstemp(suffix='.tmp', dir=self.directory)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except BaseException:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+
+        with self._lock:
+            self._size += len(data)
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def _evict(self) -> None:
+        entries = []
+        for file in self._files():
+            try:
+                stat = file.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime_ns, stat.st_size, file))
+
+        entries.sort()
+        self._size = sum(size for _mtime, size, _file in entries)
+
+        for _mtime, size, file in entries:
+            if self._size <= self.max_bytes:
+                break
+            file.unlink(missing_ok=True)
+            self._size -= size
+
+    def info(self) -> CacheInfo:
+        return CacheInfo(self.hits, self.misses, len(self._files()))
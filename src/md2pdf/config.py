@@ -4,7 +4,18 @@ import tomllib
 from collections import UserDict
 from reportlab.lib.enums import TA_JUSTIFY, TA_CENTER, TA_LEFT, TA_RIGHT
 
-__all__ = ('load_config', 'loads_config', 'camel_case_dict', 'Style', 'Font', 'ReportAttribute', 'Report', 'Config')
+__all__ = (
+    'load_config',
+    'loads_config',
+    'camel_case_dict',
+    'CachedDict',
+    'Style',
+    'Font',
+    'ReportAttribute',
+    'Report',
+    'Defaults',
+    'Config',
+)
 
 
 RE_CAMEL_CASE = re.compile(r'_[a-z]')
@@ -20,10 +31,56 @@ def camel_case_dict(data: UserDict) -> dict:
     return {
         camel_case_key(k): getattr(data, k)
         for k, v in vars(data.__class__).items()
-        if isinstance(v, property) and getattr(data, k) is not None
+        if isinstance(v, property) and getattr(data, k) not in (None, '')
     }
 
 
+class CachedDict(UserDict):
+    """The values built from the data are computed once, any change in the data clears them.
+
+    Only the changes made through the dict are seen, call `invalidate` after editing a nested value in place,
+    like `config['reports'].append(...)`.
+    """
+
+    def __init__(self, *args, **kwargs) -> None:
+        self._cache: dict[str, _.Any] = {}
+        super().__init__(*args, **kwargs)
+
+    def __setitem__(self, key: str, value: _.Any) -> None:
+        self._cache.clear()
+        super().__setitem__(key, value)
+
+    def __delitem__(self, key: str) -> None:
+        self._cache.clear()
+        super().__delitem__(key)
+
+    def __ior__(self, other: _.Any) -> _.Self:  # type: ignore[misc]
+        self._cache.clear()
+        return super().__ior__(other)
+
+    def invalidate(self) -> _.Self:
+        """Clear the computed values"""
+        self._cache.clear()
+        return self
+
+    def __copy__(self) -> _.Self:
+        inst = super().__copy__()
+        inst._cache = {}
+        return inst
+
+    def __getstate__(self) -> dict:
+        return {k: v for k, v in vars(self).items() if k != '_cache'}
+
+    def __setstate__(self, state: dict) -> None:
+        vars(self).update(state)
+        self._cache = {}
+
+    def _cached(self, key: str, factory: _.Callable[[], _.Any]) -> _.Any:
+        if key not in self._cache:
+            self._cache[key] = factory()
+        return self._cache[key]
+
+
 class Style(UserDict):
     @property
     def name(self):
@@ -223,42 +280,42 @@ class ReportAttribute(UserDict):
         return self.get('value')
 
 
-class Report(UserDict):
+class Report(CachedDict):
     @property
     def style(self):
         return self.get('style')
 
     @property
-    def attributes(self):
-        return [ReportAttribute(**kw) for kw in self.get('attributes', [])]
+    def attributes(self) -> tuple[ReportAttribute, ...]:
+        return self._cached('attributes', lambda: tuple(ReportAttribute(**kw) for kw in self.get('attributes', [])))
 
 
-class Defaults(UserDict):
+class Defaults(CachedDict):
     @property
     def style(self) -> Style:
-        return Style(**self.get('style', {}))
+        return self._cached('style', lambda: Style(**self.get('style', {})))
 
     @property
     def report(self) -> Report:
-        return Report(**self.get('report', {}))
+        return self._cached('report', lambda: Report(**self.get('report', {})))
 
 
-class Config(UserDict):
+class Config(CachedDict):
     @property
-    def fonts(self) -> list[Font]:
-        return [Font(**kw) for kw in self.get('fonts', [])]
+    def fonts(self) -> tuple[Font, ...]:
+        return self._cached('fonts', lambda: tuple(Font(**kw) for kw in self.get('fonts', [])))
 
     @property
-    def styles(self) -> list[Style]:
-        return [Style(**kw) for kw in self.get('styles', [])]
+    def styles(self) -> tuple[Style, ...]:
+        return self._cached('styles', lambda: tuple(Style(**kw) for kw in self.get('styles', [])))
 
     @property
-    def reports(self) -> list[Report]:
-        return [Report(**kw) for kw in self.get('reports', [])]
+    def reports(self) -> tuple[Report, ...]:
+        return self._cached('reports', lambda: tuple(Report(**kw) for kw in self.get('reports', [])))
 
     @property
     def defaults(self) -> Defaults:
-        return Defaults(self.get('defaults', {}))
+        return self._cached('defaults', lambda: Defaults(self.get('defaults', {})))
 
 
 class FileLike(_.Protocol):
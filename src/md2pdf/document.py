@@ -1,26 +1,60 @@
 import typing as _
-from hashlib import shake_128
+from copy import copy
+from functools import partial
+from html import unescape
 from pathlib import Path
-from pickle import dumps as pickle_dumps
+from threading import Event, Lock
 
+from reportlab.lib import colors
 from reportlab.lib.enums import TA_JUSTIFY, TA_CENTER, TA_LEFT, TA_RIGHT
 from reportlab.lib.pagesizes import A4
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle, StyleSheet1
 from reportlab.lib.units import mm
-from reportlab.pdfbase import pdfmetrics
-from reportlab.pdfbase.ttfonts import TTFont
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Flowable, ListFlowable, KeepTogether
-
-from . import html_to_dict
+from reportlab.platypus import (
+    SimpleDocTemplate,
+    Paragraph,
+    Spacer,
+    Flowable,
+    ListFlowable,
+    KeepTogether,
+    LongTable,
+    TableStyle,
+    Indenter,
+    Preformatted,
+    PageBreak,
+)
+
+from . import fonts, md_to_dict, tables
 from .config import camel_case_dict
+from .fingerprint import fingerprint
+from .instrument import Metrics
+from .flowables import Blank, FlowableStream, Repeat
 from .parser import HtmlParser, MarkdownParser
+from .lru import CacheInfo
+from .paragraphs import ParagraphCache
+from .reports import ReportIndex, ResolveCache, ResolvedElement
 from .utils import SPACE
 
 if _.TYPE_CHECKING:  # pragma: no cover
-    from .config import Config, Report
-
-
-__all__ = ('TA_JUSTIFY', 'TA_CENTER', 'TA_LEFT', 'TA_RIGHT', 'PdfGenerator', 'Md2Pdf')
+    from concurrent.futures import Executor
+    from .config import Config
+    from .batch import BuildResult
+    from .cache import StageCache
+    from jinja2 import Template
+    from .parser import MarkdownTree
+
+
+__all__ = (
+    'TA_JUSTIFY',
+    'TA_CENTER',
+    'TA_LEFT',
+    'TA_RIGHT',
+    'BytesSink',
+    'BuildCancelled',
+    'CancellableDocTemplate',
+    'PdfGenerator',
+    'Md2Pdf',
+)
 
 
 class Writable(_.Protocol):
@@ -28,47 +62,313 @@ class Writable(_.Protocol):
         ...
 
 
+class BytesSink:
+    """Writable keeping the bytes objects written to it, reportlab writes the whole document at once"""
+
+    def __init__(self) -> None:
+        self.chunks: list[bytes] = []
+
+    def write(self, data: bytes) -> None:
+        self.chunks.append(data)
+
+    def getvalue(self) -> bytes:
+        if len(self.chunks) == 1:
+            return self.chunks[0]
+        return b''.join(self.chunks)
+
+
 class Empty:
     ...
 
 
 EMPTY = Empty()
 
+MARGIN = 20 * mm
+FRAME_WIDTH = A4[0] - 2 * MARGIN
+
+# the default padding of the table cells in reportlab
+CELL_PADDING = 6
+
+DEFAULT_TABLE_STYLE = (
+    ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+    ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+)
+
+CELL_ALIGNMENTS = {'LEFT': TA_LEFT, 'CENTER': TA_CENTER, 'RIGHT': TA_RIGHT}
+
+QUOTE_INDENT = 10 * mm
+
+# the children of these tags are walked in place, indented
+CONTAINER_TAGS = frozenset({'blockquote'})
+
+LIST_TAGS = frozenset({'ul', 'ol'})
+
+# the stylesheet is shared by the spawned documents, the styles added while building are added once
+_STYLES_LOCK = Lock()
+
+
+class BuildCancelled(Exception):
+    """The build was stopped by its cancel event"""
+
+
+class CancellableDocTemplate(SimpleDocTemplate):
+    """Document template that stops before the next flowable once `cancel` is set"""
+
+    def __init__(self, filename: str | Writable, *, cancel: Event | None = None, **kwargs) -> None:
+        super().__init__(filename, **kwargs)
+        self.cancel = cancel
+
+    def handle_flowable(self, flowables: list[Flowable]) -> None:
+        if self.cancel is not None and self.cancel.is_set():
+            raise BuildCancelled()
+        super().handle_flowable(flowables)
+
+
+# the document, the element and its resolved report, the flowable of the element or None
+ElementHandler = _.Callable[['Md2Pdf', dict, ResolvedElement], Flowable | None]
+# the document, the text and the resolved report of the element, the new text
+ValueTransform = _.Callable[['Md2Pdf', str, ResolvedElement], str]
+
+
+class _ItemFrame(_.NamedTuple):
+    lists: _.Iterator[dict]
+    parts: list[Flowable]
+
+
+class _ListFrame(_.NamedTuple):
+    element: dict
+    items: _.Iterator[dict]
+    values: list[str | list[Flowable]]
+    # the classes of the list, from its last item
+    resolved: ResolvedElement
+    # the item of the parent list, None for the top list
+    parent: _ItemFrame | None
+
 
 class PdfGenerator:
     def __init__(self) -> None:
         self.elements: list[Flowable] = []
         self.styles: StyleSheet1 = getSampleStyleSheet()
         self.keep_together: list[Flowable] = []
+        self.table_styles: dict[str, TableStyle] = {'Default': TableStyle(DEFAULT_TABLE_STYLE)}
+        self._cell_styles: dict[tuple[str, str], ParagraphStyle] = {}
+        self.paragraph_cache: ParagraphCache | None = None
+        self.metrics = Metrics()
+        # the fonts and families registered by the document, registered again when it is unpickled
+        self.fonts: dict[str, Path | str] = {}
+        self.font_families: dict[str, dict[str, Path | str]] = {}
+
+    def spawn(self) -> _.Self:
+        """New empty document sharing the styles and the settings of this one"""
+        doc = copy(self)
+        doc.elements = []
+        doc.keep_together = []
+        doc.metrics = self.metrics.spawn()
+
+        return doc
+
+    def __getstate__(self) -> dict:
+        """The settings of the document without its content, the metrics are not kept"""
+        state = vars(self).copy()
+        state.update(elements=[], keep_together=[], metrics=Metrics())
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        vars(self).update(state)
+
+        for name, ttf_file in self.fonts.items():
+            fonts.register_font(name, ttf_file)
+        for name, faces in self.font_families.items():
+            fonts.register_font_family(name, faces)
+
+    def instrument(self, callback: _.Callable[[dict], None] | None = None, *, trace_memory: bool = False) -> _.Self:
+        """Record the time of each stage and count the flowables, the `callback` receives the report after the build.
+
+        With `trace_memory`, the allocations are traced too, which makes the conversion slower.
+        """
+        self.metrics = Metrics(True, callback, trace_memory)
+        return self
+
+    def report(self) -> dict:
+        return self.metrics.report()
+
+    def cache_paragraphs(self, cache: ParagraphCache | None = None) -> _.Self:
+        """Share the parsing and the line breaks of the identical paragraphs, the documents spawned share the cache.
+
+        Pass the same `cache` to several documents to share it between them.
+        """
+        self.paragraph_cache = ParagraphCache() if cache is None else cache
+        return self
+
+    def paragraph_cache_info(self) -> CacheInfo | None:
+        return None if self.paragraph_cache is None else self.paragraph_cache.info()
 
     # region BUILDERS
     def build_paragraph(
         self,
         text: _.Optional[str] = None,
         style: str = 'Body',
-        bullet_text: bool = None,
+        bullet_text: str | None = None,
         frags: list = None,
         case_sensitive: int = 1,
         encoding: str = 'utf8',
     ) -> Paragraph:
-        return Paragraph(text, self.styles[style], bullet_text, frags, case_sensitive, encoding)
+        return self._paragraph(text, self.styles[style], bullet_text, frags, case_sensitive, encoding)
+
+    def _paragraph(
+        self,
+        text: str | None,
+        style: ParagraphStyle,
+        bullet_text: str | None = None,
+        frags: list | None = None,
+        case_sensitive: int = 1,
+        encoding: str = 'utf8',
+    ) -> Paragraph:
+        self.metrics.count('paragraphs')
+        if self.paragraph_cache is None or frags is not None or text is None:
+            return Paragraph(text, style, bullet_text, frags, case_sensitive, encoding)
+        return self.paragraph_cache.paragraph(text, style, bullet_text, frags, case_sensitive, encoding)
 
     def build_spacer(self, width: int, height: int, is_glue: bool = False) -> Spacer:
         return Spacer(width, height, is_glue)
 
-    def build_list(self, values: list[str], style: str, bullet_type: str = 'bullet') -> ListFlowable:
+    def build_list(
+        self, values: _.Sequence[str | list[Flowable]], style: str, bullet_type: str = 'bullet', start: int | None = None
+    ) -> ListFlowable:
+        """The values are the text of the items, or the flowables of the items with nested lists"""
         style = self.styles[style]
-        return ListFlowable([Paragraph(v, style=style) for v in values], bulletType=bullet_type)
+        self.metrics.count('lists')
+
+        items = [self._paragraph(v, style) if isinstance(v, str) else v for v in values]
+        if start is None:
+            return ListFlowable(items, bulletType=bullet_type)
+        return ListFlowable(items, bulletType=bullet_type, start=start)
+
+    def build_preformatted(self, text: str, style: str) -> Preformatted:
+        return Preformatted(text, self.styles[style])
+
+    def build_repeat(self, char: str, times: int, style: str) -> Repeat:
+        return Repeat(char, times, self.styles[style])
+
+    def build_blank(self, lines: int, style: str) -> Blank:
+        return Blank(lines, self.styles[style])
+
+    def build_three_columns_paragraph(
+        self,
+        texts: _.Iterable[str],
+        size: int,
+        style: str,
+        bullet_text: str | None = None,
+        frags: list = None,
+        case_sensitive: int = 1,
+        encoding: str = 'utf8',
+    ) -> Paragraph:
+        left, center, right = texts
+        center_size = len(center)
+        left_size, remainder = divmod(size - center_size, 2)
+
+        text = f'{left:<{left_size}}{center}{right:>{left_size + remainder}}'.replace(' ', SPACE)
+
+        return self.build_paragraph(text, style, bullet_text, frags, case_sensitive, encoding)
 
     def build_keep_together(self, flowables: list[Flowable]) -> KeepTogether:
+        self.metrics.count('keep_together')
         return KeepTogether(flowables)
 
+    def _cell_style(self, style: str, align: str) -> ParagraphStyle:
+        if (ret := self._cell_styles.get((style, align))) is None:
+            parent = self.styles[style]
+            ret = ParagraphStyle(f'{parent.name} {align}', parent=parent, alignment=CELL_ALIGNMENTS[align])
+            self._cell_styles[style, align] = ret
+        return ret
+
+    def _build_cell(
+        self, value: str, font_name: str, font_size: float, width: float, header: bool, style: ParagraphStyle
+    ) -> str | Paragraph:
+        if '<' not in value:
+            text = tables.plain_text(value)
+            if tables.string_width(text, font_name, font_size) <= width - 2 * CELL_PADDING:
+                return text
+
+        return self._paragraph(f'<b>{value}</b>' if header else value, style)
+
+    def build_table(
+        self,
+        rows: list[list[str]],
+        style: str = 'Body',
+        table_style: str = 'Default',
+        header_rows: int = 1,
+        align: list[str] | None = None,
+    ) -> LongTable:
+        """Table with the column widths computed from the cell texts, the header rows repeat on each page.
+
+        The cells that fit in their column are drawn as strings, the others are wrapped in paragraphs.
+        The short rows are completed with empty cells.
+        Raises ValueError when the table has no cell or the table style is not defined.
+        """
+        if table_style not in self.table_styles:
+            raise ValueError(f'Table style {table_style!r} does not exists.')
+        if not any(rows):
+            raise ValueError('The table has no cell.')
+
+        data = tables.TableData(rows, header_rows, align or [])
+        paragraph_style = self.styles[style]
+        font_name, font_size = paragraph_style.fontName, paragraph_style.fontSize
+        header_font = tables.bold_font(font_name)
+
+        widths = tables.column_widths(data, font_name, font_size, CELL_PADDING, FRAME_WIDTH)
+        aligns = [*data.align, *['LEFT'] * (len(widths) - len(data.align))]
+
+        cells = []
+        for index, row in enumerate(rows):
+            header = index < header_rows
+            font = header_font if header else font_name
+            cells.append(
+                [
+                    self._build_cell(value, font, font_size, widths[col], header, self._cell_style(style, aligns[col]))
+                    for col, value in enumerate([*row, *[''] * (len(widths) - len(row))])
+                ]
+            )
+
+        commands: list[tuple[_.Any, ...]] = [('FONT', (0, 0), (-1, -1), font_name, font_size, paragraph_style.leading)]
+        if header_rows:
+            commands.append(('FONT', (0, 0), (-1, header_rows - 1), header_font, font_size, paragraph_style.leading))
+            commands.append(('BACKGROUND', (0, 0), (-1, header_rows - 1), colors.whitesmoke))
+        commands.extend(('ALIGN', (col, 0), (col, -1), a) for col, a in enumerate(aligns) if a != 'LEFT')
+
+        table = LongTable(cells, colWidths=widths, repeatRows=header_rows, style=self.table_styles[table_style])
+        table.setStyle(TableStyle(commands))
+
+        self.metrics.count('tables')
+        return table
+
+    def build_stream(self, elements: _.Iterable[tuple[Flowable, bool]]) -> _.Iterator[Flowable]:
+        """Same grouping as `append_element`, flowables marked to keep together go with the next one"""
+        keep_together: list[Flowable] = []
+
+        for element, keep in elements:
+            if keep:
+                keep_together.append(element)
+            elif keep_together:
+                keep_together.append(element)
+                yield self.build_keep_together(keep_together)
+                keep_together = []
+            else:
+                yield element
+
+        if keep_together:
+            yield self.build_keep_together(keep_together)
+
     # endregion
 
     # region ADDERS
+    def _is_font_file(self, ttf_file: Path | str) -> bool:
+        return isinstance(ttf_file, (Path, str)) and Path(ttf_file).is_file()
+
     def add_font(self, name: str, ttf_file: Path | str, *, raise_error: bool = True) -> _.Self:
-        if isinstance(ttf_file, (Path, str)) and Path(ttf_file).is_file():
-            pdfmetrics.registerFont(TTFont(name, ttf_file))
+        if self._is_font_file(ttf_file):
+            fonts.register_font(name, ttf_file)
+            self.fonts[name] = ttf_file
 
         elif raise_error:
             raise ValueError(f'Font file {ttf_file!s} does not exists.')
@@ -83,15 +383,19 @@ class PdfGenerator:
         bold_path: Path | str,
         bold_italic_path: Path | str,
     ) -> _.Self:
-        self.add_font(name, regular_path, raise_error=True)
-        self.add_font(f'{name}-Italic', italic_path, raise_error=False)
-        self.add_font(f'{name}-Bold', bold_path, raise_error=False)
-        self.add_font(f'{name}-BoldItalic', bold_italic_path, raise_error=False)
+        if not self._is_font_file(regular_path):
+            raise ValueError(f'Font file {regular_path!s} does not exists.')
 
-        pdfmetrics.registerFontFamily(
-            name, normal=name, bold=f'{name}-Bold', italic=f'{name}-Italic', boldItalic=f'{name}-BoldItalic'
-        )
+        faces = {'normal': regular_path, 'italic': italic_path, 'bold': bold_path, 'bold_italic': bold_italic_path}
+        faces = {k: v for k, v in faces.items() if self._is_font_file(v)}
+        fonts.register_font_family(name, faces)
+        self.font_families[name] = faces
+
+        return self
 
+    def add_table_style(self, name: str, commands: _.Iterable[tuple] = DEFAULT_TABLE_STYLE) -> _.Self:
+        """Table style with the reportlab commands, used by `build_table` with the name"""
+        self.table_styles[name] = TableStyle(list(commands))
         return self
 
     def add_style(self, name: str, **kwargs) -> _.Self:
@@ -100,6 +404,8 @@ class PdfGenerator:
 
         style = ParagraphStyle(name, **kwargs)
         self.styles.add(style)
+
+        self._cell_styles.clear()
         return self
 
     # endregion
@@ -120,7 +426,7 @@ class PdfGenerator:
         self,
         text: str = None,
         style: str = 'Body',
-        bullet_text: bool = None,
+        bullet_text: str | None = None,
         frags: list = None,
         case_sensitive: int = 1,
         encoding: str = 'utf8',
@@ -142,22 +448,20 @@ class PdfGenerator:
         texts: _.Iterable[str],
         size: int,
         style: str,
-        bullet_text: bool = None,
+        bullet_text: str | None = None,
         frags: list = None,
         case_sensitive: int = 1,
         encoding: str = 'utf8',
         keep_together: bool = False,
     ) -> _.Self:
-        left, center, right = texts
-        center_size = len(center)
-        left_size, remainder = divmod(size - center_size, 2)
+        paragraph = self.build_three_columns_paragraph(texts, size, style, bullet_text, frags, case_sensitive, encoding)
 
-        text = f'{left:<{left_size}}{center}{right:>{left_size + remainder}}'.replace(' ', SPACE)
+        self.append_element(paragraph, keep_together)
 
-        return self.append_paragraph(text, style, bullet_text, frags, case_sensitive, encoding, keep_together)
+        return self
 
     def append_bullet_list(
-        self, values: list[str], style: str, bullet_type: str = 'bullet', keep_together: bool = False
+        self, values: _.Sequence[str], style: str, bullet_type: str = 'bullet', keep_together: bool = False
     ) -> _.Self:
         bullet_list = self.build_list(values, style, bullet_type)
 
@@ -165,6 +469,30 @@ class PdfGenerator:
 
         return self
 
+    def append_table(
+        self,
+        rows: list[list[str]],
+        style: str = 'Body',
+        table_style: str = 'Default',
+        header_rows: int = 1,
+        align: list[str] | None = None,
+        keep_together: bool = False,
+    ) -> _.Self:
+        table = self.build_table(rows, style, table_style, header_rows, align)
+
+        self.append_element(table, keep_together)
+
+        return self
+
+    def append_stream(self, elements: _.Iterable[tuple[Flowable, bool]]) -> _.Self:
+        """The elements are only built when the document template asks for them"""
+        if not isinstance(self.elements, FlowableStream):
+            self.elements = FlowableStream(self.elements)
+
+        self.elements.feed(self.build_stream(elements))
+
+        return self
+
     # endregion
 
     def build(
@@ -176,15 +504,17 @@ class PdfGenerator:
         subject: str = '',
         keywords: _.Iterable[str] = None,
         creator: str = '',
+        cancel: Event | None = None,
         **kwargs,
     ) -> None:
-        doc = SimpleDocTemplate(
+        doc = CancellableDocTemplate(
             file_name,
+            cancel=cancel,
             pagesize=A4,
-            rightMargin=20 * mm,
-            leftMargin=20 * mm,
-            topMargin=20 * mm,
-            bottomMargin=20 * mm,
+            rightMargin=MARGIN,
+            leftMargin=MARGIN,
+            topMargin=MARGIN,
+            bottomMargin=MARGIN,
             **kwargs,
         )
 
@@ -194,13 +524,25 @@ class PdfGenerator:
         doc.keywords = keywords
         doc.creator = creator
 
-        doc.build(self.elements)
+        if self.keep_together:
+            self.elements.append(self.build_keep_together(self.keep_together))
+            self.keep_together = []
+
+        with self.metrics.stage('layout'):
+            doc.build(self.elements)
+
+        self.metrics.count('pages', doc.page)
+        self.metrics.emit()
 
     @classmethod
-    def version(cls, data: _.Any) -> str:
-        return shake_128(pickle_dumps(data)).hexdigest(4)
+    def version(cls, data: _.Any, size: int = 16) -> str:
+        """Fingerprint of the data with `size` bytes, see `fingerprint.canonical` for the accepted types.
+
+        Raises TypeError for the other types, like the arbitrary objects the former pickle digest accepted.
+        """
+        return fingerprint(data, size)
 
-    def save(self, file_name: Path | Writable, **meta) -> None:
+    def save(self, file_name: Path | Writable, *, cancel: Event | None = None, **meta) -> None:
         name = meta.get('name', '')
         version = meta.get('version', '')
 
@@ -217,17 +559,73 @@ class PdfGenerator:
             creator=name,
             subject=f'version="{version}"',
             keywords=meta.get('keywords', []),
+            cancel=cancel,
         )
 
+    def render_bytes(self, **meta) -> bytes:
+        """The pdf document, the bytes object created by reportlab is returned without a copy"""
+        sink = BytesSink()
+        self.save(sink, **meta)
+
+        return sink.getvalue()
+
+    def render_memoryview(self, **meta) -> memoryview:
+        return memoryview(self.render_bytes(**meta))
+
+    def iter_chunks(self, chunk_size: int = 64 * 1024, **meta) -> _.Iterator[memoryview]:
+        """The pdf document in slices of `chunk_size` bytes, it is built when the first chunk is requested"""
+        view = self.render_memoryview(**meta)
+
+        for start in range(0, len(view), chunk_size):
+            yield view[start : start + chunk_size]
+
+    async def asave(self, file_name: Path | Writable, *, executor: 'Executor | None' = None, **meta) -> None:
+        """`save` in the executor (the default executor of the loop when None).
+
+        Cancelling the task stops the build before the next flowable.
+        """
+        import asyncio  # pylint: disable=import-outside-toplevel
+
+        cancel = Event()
+        save = partial(self.save, file_name, cancel=cancel, **meta)
+        try:
+            await asyncio.get_running_loop().run_in_executor(executor, save)
+        except asyncio.CancelledError:
+            cancel.set()
+            raise
+
 
 class Md2Pdf(PdfGenerator):
-    def __init__(self) -> None:
+    def __init__(self, *, direct: bool = False, stream: bool = False, cache: 'StageCache | None' = None) -> None:
         super().__init__()
 
         self.config: Config  # | None = None
         self.root_dir: Path | str | None = None
+        self.cache = cache
+        self.html_parser = HtmlParser()
+        self.md_parser = MarkdownParser(cache=cache)
+        self.report_index: ReportIndex
+        self.resolve_cache = ResolveCache()
+        self.direct = direct
+        self.stream = stream
+        self.tag_handlers = dict(self.TAG_HANDLERS)
+        self.class_handlers = dict(self.CLASS_HANDLERS)
+        self.value_transforms = dict(self.VALUE_TRANSFORMS)
+
+    def __getstate__(self) -> dict:
+        """The parsers and the report index are created again when the document is unpickled"""
+        state = super().__getstate__()
+        del state['html_parser'], state['md_parser'], state['resolve_cache']
+        state.pop('report_index', None)
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        super().__setstate__(state)
         self.html_parser = HtmlParser()
-        self.md_parser = MarkdownParser()
+        self.md_parser = MarkdownParser(cache=self.cache)
+        self.resolve_cache = ResolveCache()
+        if hasattr(self, 'config'):
+            self._index_reports()
 
     def setup(self, config: 'Config', root_dir: Path | str | None = None) -> _.Self:
         self.config = config
@@ -247,27 +645,39 @@ class Md2Pdf(PdfGenerator):
             style = style.__class__({**default, **style})
             self.add_style(**camel_case_dict(style))
 
+        self._index_reports()
+
         return self
 
-    def _get_elem_attr(self, element: dict, name: str, default: _.Any = None) -> str:
-        if name == 'tag':
-            return element[name]
-        return element['attributes'].get(name, default or EMPTY)
+    def _index_reports(self) -> None:
+        self.report_index = ReportIndex(self.config.reports, self.config.defaults.report, self._get_elem_attr)
+        self.resolve_cache.clear()
+
+    def add_tag_handler(self, tag: str, handler: 'ElementHandler') -> _.Self:
+        """Build the flowable of the elements with the tag, the handler returns None to skip the element.
 
-    def _find_report_config(self, element: dict) -> dict:
-        ret: Report | dict = {}
+        The handlers are pickled with the document by `build_many` with workers, they must be importable functions.
+        """
+        self.tag_handlers[tag] = handler
+        return self
 
-        for report in self.config.reports:
-            if all(self._get_elem_attr(element, a['name']) == a['value'] for a in report.attributes):
-                ret = report
-                break
+    def add_class_handler(self, name: str, handler: 'ElementHandler') -> _.Self:
+        """Build the flowable of the elements with the class, instead of the handler of their tag"""
+        self.class_handlers[name] = handler
+        return self
 
-        ret = dict(ret or self.config.defaults.report or {})
+    def add_value_transform(self, name: str, transform: 'ValueTransform') -> _.Self:
+        """Transform the text of the paragraphs and list items with the class"""
+        self.value_transforms[name] = transform
+        return self
 
-        if 'attributes' in ret:
-            del ret['attributes']
+    def _get_elem_attr(self, element: dict, name: str, default: _.Any = None) -> str:
+        if name == 'tag':
+            return element[name]
+        return element['attributes'].get(name, default or EMPTY)
 
-        return ret
+    def _find_report_config(self, element: dict) -> _.Mapping[str, _.Any]:
+        return self.report_index.find(element)
 
     def _find_report_classes(self, element: dict) -> list[str]:
         return element.get('attributes', {}).get('class', '').split(' ')
@@ -286,66 +696,360 @@ class Md2Pdf(PdfGenerator):
                     print(f'ERROR: In {key_style!r}, the key {k!r} is invalid.')
         return ret
 
-    def _make_key_value(self, value: str, classes: list[str], key_style: str = None) -> str:
-        if 'key-value' in classes:
-            key, value = value.split(':') if ':' in value else (value, '')
+    def _make_key_value(self, value: str, resolved: ResolvedElement) -> str:
+        key, value = value.split(':') if ':' in value else (value, '')
 
-            key = f'{key}:'
-            for s in self._make_key_styles(key_style or 'bold'):
-                key = f'<{s}>{key}</{s}>'
+        key = f'{key}:'
+        for s in resolved.key_styles:
+            key = f'<{s}>{key}</{s}>'
 
-            return f'{key}{value}'
+        return f'{key}{value}'
 
+    def _transform_value(self, value: str, resolved: ResolvedElement) -> str:
+        for name in resolved.classes:
+            if (transform := self.value_transforms.get(name)) is not None:
+                value = transform(self, value, resolved)
         return value
 
-    def build_from_data(self, data: dict) -> _.Self:
-        for child in data.get('children', []):
-            config = self._find_report_config(child)
-            classes = self._find_report_classes(child)
-
-            if child.get('tag') in {f'h{i}' for i in range(1, 7)} | {'p'}:
-                if '3-columns' in classes:
-                    self.append_three_columns_paragraph(
-                        child.get('value', '').split('#'),
-                        size=int(self._get_elem_attr(child, 'size', 0)),
-                        style=config.get('style', ''),
-                        keep_together='keep-together' in classes,
-                    )
-                else:
-                    key_styles = child.get('attributes', {}).get('style', '')
-                    value = self._make_key_value(child.get('value', ''), classes, key_styles)
+    def _resolve_element(self, element: dict) -> ResolvedElement:
+        classes = self._find_report_classes(element)
+
+        if 'key-value' in classes:
+            key_styles = self._make_key_styles(element.get('attributes', {}).get('style', '') or 'bold')
+        else:
+            key_styles = []
+
+        config, matched = self.report_index.lookup(element)
+
+        return ResolvedElement(config, classes, key_styles, matched)
+
+    def resolve(self, element: dict) -> ResolvedElement:
+        """The report config, classes and key styles of the element, cached by the element signature"""
+        return self.resolve_cache.get(element, self._resolve_element)
+
+    def resolve_cache_info(self) -> CacheInfo:
+        return self.resolve_cache.info()
+
+    # region ELEMENT HANDLERS
+    def _paragraph_flowable(self, element: dict, resolved: ResolvedElement) -> Flowable:
+        value = self._transform_value(element.get('value', ''), resolved)
+
+        return self.build_paragraph(value, style=resolved.config.get('style', ''))
+
+    def _three_columns_flowable(self, element: dict, resolved: ResolvedElement) -> Flowable:
+        return self.build_three_columns_paragraph(
+            element.get('value', '').split('#'),
+            size=int(self._get_elem_attr(element, 'size', 0)),
+            style=resolved.config.get('style', ''),
+        )
+
+    def _list_frame(self, element: dict, parent: _ItemFrame | None = None) -> _ListFrame:
+        # the classes of the list are set on its last item
+        if items := element.get('children', []):
+            resolved = self.resolve(items[-1])
+        else:
+            resolved = ResolvedElement({}, [], [])
+
+        return _ListFrame(element, iter(items), [], resolved, parent)
 
-                    self.append_paragraph(value, style=config.get('style', ''), keep_together='keep-together' in classes)
+    def _list_flowable(self, element: dict, resolved: ResolvedElement) -> Flowable:
+        """The list with its nested lists, built with a stack so the depth is not limited by the recursion"""
+        style = resolved.config.get('style', '')
+        stack: list[_ListFrame | _ItemFrame] = [self._list_frame(element)]
 
-            elif child.get('tag') in {'ul'}:
-                if len(items := child.get('children', [])):
-                    list_classes = self._find_report_classes(items[-1])
-                    key_styles = items[-1].get('attributes', {}).get('style', '')
+        while True:
+            frame = stack[-1]
+
+            if isinstance(frame, _ItemFrame):
+                if (nested := next(frame.lists, None)) is None:
+                    stack.pop()
                 else:
-                    list_classes = []
-                    key_styles = ''
+                    stack.append(self._list_frame(nested, frame))
+                continue
+
+            if (item := next(frame.items, None)) is None:
+                stack.pop()
+                attributes = frame.element.get('attributes', {})
+                flowable = self.build_list(
+                    frame.values,
+                    style=style,
+                    bullet_type='1' if frame.element.get('tag') == 'ol' else 'bullet',
+                    start=int(attributes['start']) if 'start' in attributes else None,
+                )
+                if frame.parent is None:
+                    return flowable
+                frame.parent.parts.append(flowable)
+                continue
+
+            values = [item.get('value', '')]
+            values.extend(c.get('value', '') for c in item.get('children', []) if c.get('tag') == 'p')
+            value = self._transform_value('<br/>'.join(v for v in values if v), frame.resolved)
+
+            if not (lists := [c for c in item.get('children', []) if c.get('tag') in LIST_TAGS]):
+                frame.values.append(value)
+                continue
+
+            # the nested lists are added to the parts of the item when they are built
+            parts: list[Flowable] = [self._paragraph(value, self.styles[style])]
+            frame.values.append(parts)
+            stack.append(_ItemFrame(iter(lists), parts))
+
+    def _code_style(self, style: str) -> str:
+        name = f'{style} Code'
+        with _STYLES_LOCK:
+            if name not in self.styles:
+                self.add_style(name, parent=style, fontName='Courier')
+        return name
+
+    def _pre_flowable(self, element: dict, resolved: ResolvedElement) -> Flowable:
+        code = ''.join(c.get('value', '') for c in element.get('children', [])) or element.get('value', '')
+
+        style = resolved.config.get('style', '')
+        if not resolved.matched:
+            style = self._code_style(style)
+
+        return self.build_preformatted(unescape(code), style)
+
+    def _repeat_flowable(self, element: dict, resolved: ResolvedElement) -> Flowable:
+        attributes = element.get('attributes', {})
+        return self.build_repeat(
+            attributes.get('char') or '-', int(attributes.get('times') or 1), resolved.config.get('style', '')
+        )
 
-                values = [
-                    self._make_key_value(c.get('value', ''), list_classes, key_styles) for c in child.get('children', [])
-                ]
+    def _blank_flowable(self, element: dict, resolved: ResolvedElement) -> Flowable:
+        lines = int(element.get('attributes', {}).get('lines') or 1)
+        return self.build_blank(lines, resolved.config.get('style', ''))
+
+    def _table_flowable(self, element: dict, resolved: ResolvedElement) -> Flowable | None:
+        if not any((data := tables.table_data(element)).rows):
+            return None
+
+        return self.build_table(
+            data.rows,
+            style=resolved.config.get('style', ''),
+            table_style=resolved.config.get('table_style', 'Default'),
+            header_rows=data.header_rows,
+            align=data.align,
+        )
+
+    TAG_HANDLERS: dict[str, 'ElementHandler'] = {
+        **dict.fromkeys((f'h{i}' for i in range(1, 7)), _paragraph_flowable),
+        'p': _paragraph_flowable,
+        'ul': _list_flowable,
+        'ol': _list_flowable,
+        'pre': _pre_flowable,
+        'table': _table_flowable,
+        'repeat': _repeat_flowable,
+        'blank': _blank_flowable,
+    }
+
+    CLASS_HANDLERS: dict[str, 'ElementHandler'] = {
+        '3-columns': _three_columns_flowable,
+    }
+
+    VALUE_TRANSFORMS: dict[str, 'ValueTransform'] = {
+        'key-value': _make_key_value,
+    }
+
+    # endregion
+
+    def iter_elements(self, data: dict) -> _.Iterator[tuple[Flowable, bool]]:
+        """The flowables of the data, with the keep together flag.
+
+        The tree is walked once with a stack, the children of a block quote are walked in place
+        between two indenters. The handler of a class of the element takes precedence over the handler of its tag.
+        """
+        stack: list[tuple[_.Iterator[dict], Flowable | None]] = [(iter(data.get('children', [])), None)]
+
+        while stack:
+            children, closing = stack[-1]
 
-                self.append_bullet_list(values, style=config.get('style', ''), keep_together='keep-together' in classes)
+            if (child := next(children, None)) is None:
+                stack.pop()
+                if closing is not None:
+                    yield closing, False
+                continue
+
+            resolved = self.resolve(child)
+            keep_together = 'keep-together' in resolved.classes
+
+            if (tag := child.get('tag', '')) in CONTAINER_TAGS:
+                yield Indenter(QUOTE_INDENT), keep_together
+                stack.append((iter(child.get('children', [])), Indenter(-QUOTE_INDENT)))
+                continue
+
+            if tag == 'p' and not child.get('value') and child.get('children'):
+                # html wrapped in a paragraph by markdown, like the custom tags
+                stack.append((iter(child['children']), None))
+                continue
+
+            handler = self.tag_handlers.get(tag)
+            for name in resolved.classes:
+                if name in self.class_handlers:
+                    handler = self.class_handlers[name]
+                    break
+
+            if handler is not None and (flowable := handler(self, child, resolved)) is not None:
+                yield flowable, keep_together
+
+    def build_from_data(self, data: dict, *, cancel: Event | None = None) -> _.Self:
+        """Build the flowables of the elements, raises `BuildCancelled` before the next element once `cancel` is set.
+
+        In stream mode, nothing is built yet and the `cancel` of `save` is the one checked.
+        """
+        if self.stream:
+            return self.append_stream(self.iter_elements(data))
+
+        with self.metrics.stage('flowables'):
+            for element, keep_together in self.iter_elements(data):
+                if cancel is not None and cancel.is_set():
+                    raise BuildCancelled()
+                self.append_element(element, keep_together)
 
         return self
 
+    def _loads_html(self, text: str, cached: bool = True) -> dict:
+        """The dict of the html, with `cached` False the stage cache is not used"""
+        if cached and self.cache is not None and (data := self.cache.get('dict', text)) is not None:
+            return data
+
+        # html_to_json is only needed by this pipeline
+        from . import html_to_dict  # pylint: disable=import-outside-toplevel
+
+        with self.metrics.stage('html_to_dict'):
+            data = html_to_dict.loads(f'<data>{text}</data>')
+
+        if cached and self.cache is not None:
+            self.cache.set('dict', text, data)
+
+        return data
+
+    def _html_data(self, text: str, **kwargs) -> dict:
+        with self.metrics.stage('jinja'):
+            text = self.html_parser(text, **kwargs)
+
+        return self._loads_html(text)
+
+    def _tree_data(self, tree: 'MarkdownTree', **kwargs) -> dict:
+        variables = {**tree.headers, **kwargs}
+
+        def render(value: str) -> str:
+            return self.html_parser(value, **variables)
+
+        return md_to_dict.loads(tree, render)
+
+    def _file_data(self, md_file: str | Path) -> dict:
+        if self.direct:
+            with Path(md_file).open(encoding='utf8') as f, self.metrics.stage('markdown'):
+                tree = self.md_parser.tree_from_file(f)
+            return self._tree_data(tree)
+
+        with Path(md_file).open(encoding='utf8') as f, self.metrics.stage('markdown'):
+            text, kwargs = self.md_parser.from_file(f)
+        return self._html_data(text, **kwargs)
+
+    def _iter_file(self, md_file: str | Path) -> _.Iterator[tuple[Flowable, bool]]:
+        yield from self.iter_elements(self._file_data(md_file))
+
     def build_from_html(self, text: str, **kwargs) -> _.Self:
-        text = self.html_parser(text, **kwargs)
-        data = html_to_dict.loads(f'<data>{text}</data>')
+        return self.build_from_data(self._html_data(text, **kwargs))
+
+    def build_from_template(self, template: 'Template', **kwargs) -> _.Self:
+        """Render the compiled html template with the variables and build its content.
+
+        Each set of variables renders a different html, so it is not stored in the stage cache.
+        """
+        with self.metrics.stage('jinja'):
+            html = template.render(**kwargs)
 
-        return self.build_from_data(data)
+        return self.build_from_data(self._loads_html(html, cached=False))
+
+    def build_from_tree(self, tree: 'MarkdownTree', **kwargs) -> _.Self:
+        return self.build_from_data(self._tree_data(tree, **kwargs))
 
     def build_from_md(self, text: str) -> _.Self:
-        text, kwargs = self.md_parser(text)
+        if self.direct:
+            with self.metrics.stage('markdown'):
+                tree = self.md_parser.tree(text)
+            return self.build_from_tree(tree)
+
+        with self.metrics.stage('markdown'):
+            text, kwargs = self.md_parser(text)
 
         return self.build_from_html(text, **kwargs)
 
     def build_from_file(self, md_file: str | Path) -> _.Self:
-        with Path(md_file).open(encoding='utf8') as f:
-            text, kwargs = self.md_parser.from_file(f)
+        return self.build_from_data(self._file_data(md_file))
 
-        return self.build_from_html(text, **kwargs)
+    def build_from_files(self, md_files: _.Iterable[str | Path]) -> _.Self:
+        """One document of all the markdown files, each file starts on a new page.
+
+        The flowables are always streamed, a file is only read and built when the layout reaches it,
+        so the memory holds one file at a time. The fonts and styles are the ones of this document.
+        """
+        for index, md_file in enumerate(md_files):
+            if index:
+                self.append_stream([(PageBreak(), False)])
+            self.append_stream(self._iter_file(md_file))
+
+        return self
+
+    def _build_file(self, md_file: str | Path, cancel: Event) -> _.Self:
+        data = self._file_data(md_file)
+        if cancel.is_set():
+            raise BuildCancelled()
+        return self.build_from_data(data, cancel=cancel)
+
+    async def abuild_from_file(self, md_file: str | Path, *, executor: 'Executor | None' = None) -> _.Self:
+        """`build_from_file` in the executor (the default executor of the loop when None).
+
+        Cancelling the task stops the build before the next element.
+        """
+        import asyncio  # pylint: disable=import-outside-toplevel
+
+        cancel = Event()
+        build = partial(self._build_file, md_file, cancel)
+        try:
+            return await asyncio.get_running_loop().run_in_executor(executor, build)
+        except asyncio.CancelledError:
+            cancel.set()
+            raise
+
+    def build_merge(self, text: str, records: _.Iterable[dict]) -> _.Iterator[tuple[dict, _.Self]]:
+        """Parse and compile the markdown once, and build one document per record.
+
+        The record values overwrite the headers of the markdown.
+        """
+        if self.direct:
+            with self.metrics.stage('markdown'):
+                tree = self.md_parser.tree(text)
+            for record in records:
+                yield record, self.spawn().build_from_tree(tree, **record)
+            return
+
+        with self.metrics.stage('markdown'):
+            content, headers = self.md_parser(text)
+        with self.metrics.stage('jinja'):
+            template = self.html_parser.compile(content)
+
+        for record in records:
+            yield record, self.spawn().build_from_template(template, **{**headers, **record})
+
+    def save_merge(
+        self, text: str, records: _.Iterable[dict], file_name: _.Callable[[dict], Path | Writable], **meta
+    ) -> None:
+        for record, doc in self.build_merge(text, records):
+            doc.save(file_name(record), **meta)
+
+    def build_many(
+        self,
+        files: _.Iterable[Path | str],
+        out_dir: Path | str,
+        workers: int | None = None,
+        manifest: Path | str | None = None,
+        **meta,
+    ) -> list['BuildResult']:
+        """Build many markdown files in a process pool, configured once per worker"""
+        from . import batch  # pylint: disable=import-outside-toplevel
+
+        return batch.build_many(self, files, out_dir, workers, manifest, **meta)
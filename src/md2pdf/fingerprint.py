@@ -0,0 +1,117 @@
+import json
+import typing as _
+from collections.abc import Mapping
+from datetime import date, datetime, time
+from hashlib import blake2b
+from importlib.metadata import PackageNotFoundError, version
+from pathlib import Path, PurePath
+from threading import Lock
+
+if _.TYPE_CHECKING:  # pragma: no cover
+    from .config import Config
+
+__all__ = ('library_version', 'canonical', 'file_digest', 'Fingerprint', 'fingerprint', 'document_fingerprint')
+
+
+def library_version() -> str:
+    try:
+        return version('markdown-to-pdf')
+    except PackageNotFoundError:  # pragma: no cover
+        return ''
+
+
+def _normalize(data: _.Any) -> _.Any:
+    match data:
+        case None | bool() | int() | str():
+            return data
+        case float():
+            return int(data) if data.is_integer() else data
+        case Mapping():
+            return {str(k): _normalize(v) for k, v in data.items()}
+        case set() | frozenset():
+            return sorted((_normalize(v) for v in data), key=canonical)
+        case list() | tuple():
+            return [_normalize(v) for v in data]
+        case bytes() | bytearray() | memoryview():
+            return bytes(data).hex()
+        case PurePath():
+            return data.as_posix()
+        case datetime() | date() | time():
+            return data.isoformat()
+
+    raise TypeError(f'Cannot fingerprint {data.__class__.__name__}')
+
+
+def canonical(data: _.Any) -> str:
+    """Serialization that does not depend on the order of the keys, the python version or the container types.
+
+    Mappings (including `UserDict`) become dicts, tuples become lists, sets are sorted
+    and floats with an integer value are the same as the integer.
+    """
+    return json.dumps(_normalize(data), sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+
+
+# digest of the files, by resolved path, modification time and size
+_FILES: dict[tuple[str, int, int], bytes] = {}
+_LOCK = Lock()
+
+
+def file_digest(file: Path | str) -> bytes:
+    """Digest of the file content, read once while the file is not changed"""
+    path = Path(file).resolve()
+    stat = path.stat()
+    key = (str(path), stat.st_mtime_ns, stat.st_size)
+
+    with _LOCK:
+        if (ret := _FILES.get(key)) is not None:
+            return ret
+
+    ret = blake2b(path.read_bytes()).digest()
+
+    with _LOCK:
+        _FILES[key] = ret
+
+    return ret
+
+
+class Fingerprint:
+    """Incremental fingerprint, each part is length prefixed so the parts can not run into each other"""
+
+    def __init__(self, size: int = 16) -> None:
+        self.size = size
+        self._hash = blake2b(digest_size=size)
+
+    def _update(self, kind: bytes, data: bytes) -> _.Self:
+        self._hash.update(kind + len(data).to_bytes(8, 'big') + data)
+        return self
+
+    def update(self, data: _.Any) -> _.Self:
+        return self._update(b'd', canonical(data).encode())
+
+    def update_text(self, text: str) -> _.Self:
+        return self._update(b't', text.encode())
+
+    def update_file(self, file: Path | str) -> _.Self:
+        return self._update(b'f', file_digest(file))
+
+    def hexdigest(self) -> str:
+        return self._hash.hexdigest()
+
+
+def fingerprint(data: _.Any, size: int = 16) -> str:
+    return Fingerprint(size).update(data).hexdigest()
+
+
+def document_fingerprint(
+    config: 'Config', text: str = '', root_dir: Path | str | None = None, size: int = 16, **extra: _.Any
+) -> str:
+    """Fingerprint of the configuration, the font files it references, the markdown text and the extra values"""
+    root_dir = Path(root_dir or '.')
+    fp = Fingerprint(size).update(library_version()).update(config.data)
+
+    for font in config.fonts:
+        for path in (font.regular, font.italic, font.bold, font.bold_italic):
+            if path and (root_dir / path).is_file():
+                fp.update_file(root_dir / path)
+
+    return fp.update(extra).update_text(text).hexdigest()
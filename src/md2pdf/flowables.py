@@ -0,0 +1,131 @@
+import typing as _
+from functools import lru_cache
+
+from reportlab.lib.enums import TA_CENTER, TA_RIGHT
+from reportlab.lib.styles import ParagraphStyle
+from reportlab.pdfbase.pdfmetrics import stringWidth
+from reportlab.platypus import Flowable
+
+__all__ = ('FlowableStream', 'repeat_line', 'Repeat', 'Blank')
+
+
+class FlowableStream(list):
+    """List of flowables filled on demand while the document template consumes it.
+
+    The template only looks at the front of the list, so it is enough to keep one flowable,
+    or the whole `keepWithNext` chain at the front plus the flowable after it, in memory.
+    """
+
+    def __init__(self, *iterables: _.Iterable[Flowable]) -> None:
+        super().__init__()
+        self._pending: list[_.Iterator[Flowable]] = [iter(i) for i in iterables]
+
+    def feed(self, iterable: _.Iterable[Flowable]) -> None:
+        self._pending.append(iter(iterable))
+
+    def _pull(self) -> bool:
+        while self._pending:
+            try:
+                list.append(self, next(self._pending[0]))
+                return True
+            except StopIteration:
+                self._pending.pop(0)
+
+        return False
+
+    def _fill(self) -> None:
+        if not list.__len__(self):
+            self._pull()
+
+        while list.__len__(self) and getattr(list.__getitem__(self, -1), 'getKeepWithNext', bool)() and self._pull():
+            pass
+
+    def __len__(self) -> int:
+        self._fill()
+        return list.__len__(self)
+
+    def __iter__(self) -> _.Iterator[Flowable]:
+        while self._pull():
+            pass
+        return list.__iter__(self)
+
+    def append(self, item: Flowable) -> None:
+        if self._pending:
+            self.feed((item,))
+        else:
+            list.append(self, item)
+
+    def extend(self, items: _.Iterable[Flowable]) -> None:
+        if self._pending:
+            self.feed(items)
+        else:
+            list.extend(self, items)
+
+
+def _h_align(style: ParagraphStyle) -> str:
+    return {TA_CENTER: 'CENTER', TA_RIGHT: 'RIGHT'}.get(style.alignment, 'LEFT')
+
+
+@lru_cache(maxsize=1024)
+def repeat_line(char: str, times: int, font_name: str, font_size: float, available: float) -> tuple[str, float]:
+    """The characters that fit in the `available` width, and their width"""
+    char_width = stringWidth(char, font_name, font_size)
+    if char_width and char_width * times > available:
+        times = int(available // char_width)
+
+    return char * times, char_width * times
+
+
+class Repeat(Flowable):
+    """The character repeated on one line, cut to the characters that fit in the width given to `wrap`.
+
+    The line is measured once per character, count, font and width, the flowable itself only keeps the
+    line of its last `wrap`.
+    """
+
+    def __init__(self, char: str, times: int, style: ParagraphStyle) -> None:
+        super().__init__()
+        self.char = char
+        self.times = times
+        self.style = style
+        self.hAlign = _h_align(style)
+        self.text = char * times
+        self.width = 0.0
+        self.height = style.leading
+
+    def wrap(self, availWidth: float, availHeight: float) -> tuple[float, float]:
+        self.text, self.width = repeat_line(self.char, self.times, self.style.fontName, self.style.fontSize, availWidth)
+        return self.width, self.height
+
+    def getSpaceBefore(self) -> float:
+        return self.style.spaceBefore
+
+    def getSpaceAfter(self) -> float:
+        return self.style.spaceAfter
+
+    def draw(self) -> None:
+        self.canv.setFont(self.style.fontName, self.style.fontSize)
+        self.canv.setFillColor(self.style.textColor)
+        self.canv.drawString(0, self.height - self.style.fontSize, self.text)
+
+
+class Blank(Flowable):
+    """Empty lines with the leading of the style, for the fields filled in by hand"""
+
+    def __init__(self, lines: int, style: ParagraphStyle) -> None:
+        super().__init__()
+        self.style = style
+        self.width = 0
+        self.height = lines * style.leading
+
+    def wrap(self, availWidth: float, availHeight: float) -> tuple[float, float]:
+        return availWidth, self.height
+
+    def getSpaceBefore(self) -> float:
+        return self.style.spaceBefore
+
+    def getSpaceAfter(self) -> float:
+        return self.style.spaceAfter
+
+    def draw(self) -> None:
+        pass
@@ -0,0 +1,100 @@
+import typing as _
+from pathlib import Path
+from threading import Lock
+
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont
+
+from .lru import LruCache
+
+__all__ = ('FontKey', 'font_key', 'SubsetCache', 'SUBSETS', 'CachedTTFont', 'register_font', 'register_font_family')
+
+# name, resolved path, modification time and size of the file
+FontKey = tuple[str, str, int, int]
+
+
+def font_key(name: str, ttf_file: Path | str) -> FontKey:
+    path = Path(ttf_file).resolve()
+    stat = path.stat()
+    return name, str(path), stat.st_mtime_ns, stat.st_size
+
+
+class SubsetCache(LruCache):
+    """The font programs of the subsets, by font and characters of the subset.
+
+    The subsets are assigned in the order the characters are used, so documents
+    with the same repertoire reuse the programs built by the previous ones.
+    """
+
+    def __init__(self, maxsize: int = 512) -> None:
+        super().__init__(maxsize)
+
+
+SUBSETS = SubsetCache()
+
+
+class CachedTTFont(TTFont):
+    """True type font building its subsets through `SUBSETS`"""
+
+    def __init__(self, name: str, filename: Path | str, key: FontKey | None = None, **kwargs) -> None:
+        super().__init__(name, filename, **kwargs)
+
+        self.key = key or font_key(name, filename)
+        make_subset = self.face.makeSubset
+
+        def cached_make_subset(subset: list[int]) -> bytes:
+            return SUBSETS.get((self.key, tuple(subset)), lambda: make_subset(subset))
+
+        self.face.makeSubset = cached_make_subset
+
+
+_FONTS: dict[FontKey, TTFont] = {}
+_FAMILIES: set[tuple[str, tuple[FontKey, ...]]] = set()
+_LOCK = Lock()
+
+
+def _is_registered(font: TTFont) -> bool:
+    # reportlab never replaces a registered true type font, only the name matters
+    return font.fontName in pdfmetrics.getRegisteredFontNames()
+
+
+def register_font(name: str, ttf_file: Path | str) -> bool:
+    """Register the font, the file is parsed once per process while it is not changed.
+
+    Returns False when the same font was already registered.
+    """
+    key = font_key(name, ttf_file)
+
+    with _LOCK:
+        if (font := _FONTS.get(key)) is None:
+            font = _FONTS[key] = CachedTTFont(name, ttf_file, key)
+        elif _is_registered(font):
+            return False
+
+        pdfmetrics.registerFont(font)
+        return True
+
+
+def register_font_family(name: str, faces: dict[str, Path | str]) -> bool:
+    """Register the faces (normal, bold, italic, bold_italic) that exist and the family.
+
+    Returns False when the family and all its faces were already registered.
+    """
+    names = {'normal': name, 'bold': f'{name}-Bold', 'italic': f'{name}-Italic', 'bold_italic': f'{name}-BoldItalic'}
+
+    changed = False
+    keys = []
+    for face, ttf_file in faces.items():
+        changed |= register_font(names[face], ttf_file)
+        keys.append(font_key(names[face], ttf_file))
+
+    family = (name, tuple(keys))
+    if not changed and family in _FAMILIES:
+        return False
+
+    pdfmetrics.registerFontFamily(
+        name, normal=names['normal'], bold=names['bold'], italic=names['italic'], boldItalic=names['bold_italic']
+    )
+    _FAMILIES.add(family)
+
+    return True
@@ -0,0 +1,131 @@
+import tracemalloc
+import typing as _
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass, asdict
+from threading import Lock
+from time import perf_counter, thread_time
+
+__all__ = ('StageStats', 'Metrics')
+
+# tracemalloc is global, it is started by the first tracing stage and stopped after the last one
+_trace_lock = Lock()
+_trace_users = 0
+_trace_started = False
+
+
+def _acquire_tracing() -> None:
+    global _trace_users, _trace_started  # pylint: disable=global-statement
+    with _trace_lock:
+        if _trace_users == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _trace_started = True
+        _trace_users += 1
+
+
+def _release_tracing() -> None:
+    global _trace_users, _trace_started  # pylint: disable=global-statement
+    with _trace_lock:
+        _trace_users -= 1
+        if _trace_users == 0 and _trace_started:
+            tracemalloc.stop()
+            _trace_started = False
+
+
+@dataclass
+class StageStats:
+    calls: int = 0
+    wall: float = 0.0
+    # cpu time of the thread running the stage
+    cpu: float = 0.0
+    # peak of the memory allocated during the stage, when the allocations are traced
+    memory: int | None = None
+
+
+class _Frame:
+    __slots__ = ('start', 'peak')
+
+    def __init__(self, start: int) -> None:
+        self.start = start
+        self.peak = 0
+
+
+class Metrics:
+    """Wall time, cpu time and allocations of the stages of the conversion, and counters of the flowables.
+
+    Disabled, `stage` and `count` do nothing.
+    The peak of the allocations is process wide, it includes the other documents traced at the same time.
+    """
+
+    def __init__(
+        self,
+        enabled: bool = False,
+        callback: _.Callable[[dict], None] | None = None,
+        trace_memory: bool = False,
+    ) -> None:
+        self.enabled = enabled
+        self.callback = callback
+        self.trace_memory = trace_memory
+        self.stages: dict[str, StageStats] = {}
+        self.counters: Counter[str] = Counter()
+        self._frames: list[_Frame] = []
+
+    def spawn(self) -> 'Metrics':
+        """Empty metrics with the same settings"""
+        return Metrics(self.enabled, self.callback, self.trace_memory)
+
+    def count(self, name: str, value: int = 1) -> None:
+        if self.enabled:
+            self.counters[name] += value
+
+    def stage(self, name: str) -> _.ContextManager[None]:
+        if not self.enabled:
+            return nullcontext()
+        return self._stage(name)
+
+    def _start_memory(self) -> _Frame:
+        if not self._frames:
+            _acquire_tracing()
+
+        current, peak = tracemalloc.get_traced_memory()
+        if self._frames:
+            self._frames[-1].peak = max(self._frames[-1].peak, peak)
+        tracemalloc.reset_peak()
+
+        frame = _Frame(current)
+        self._frames.append(frame)
+        return frame
+
+    def _stop_memory(self, frame: _Frame) -> int:
+        peak = max(frame.peak, tracemalloc.get_traced_memory()[1])
+        self._frames.pop()
+
+        if self._frames:
+            self._frames[-1].peak = max(self._frames[-1].peak, peak)
+        else:
+            _release_tracing()
+
+        return peak - frame.start
+
+    @contextmanager
+    def _stage(self, name: str) -> _.Iterator[None]:
+        frame = self._start_memory() if self.trace_memory else None
+        wall, cpu = perf_counter(), thread_time()
+
+        try:
+            yield
+        finally:
+            stats = self.stages.setdefault(name, StageStats())
+            stats.calls += 1
+            stats.wall += perf_counter() - wall
+            stats.cpu += thread_time() - cpu
+
+            if frame is not None:
+                stats.memory = max(stats.memory or 0, self._stop_memory(frame))
+
+    def report(self) -> dict:
+        return {'stages': {k: asdict(v) for k, v in self.stages.items()}, 'counters': dict(self.counters)}
+
+    def emit(self) -> None:
+        if self.enabled and self.callback is not None:
+            self.callback(self.report())
@@ -0,0 +1,65 @@
+import typing as _
+from collections import OrderedDict
+from threading import Lock
+
+__all__ = ('CacheInfo', 'LruCache')
+
+
+class CacheInfo(_.NamedTuple):
+    hits: int
+    misses: int
+    size: int
+
+
+class LruCache:
+    """Thread safe mapping dropping the least recently used entries after `maxsize`.
+
+    Only the settings are pickled, the entries are not.
+    """
+
+    def __init__(self, maxsize: int = 128) -> None:
+        self.maxsize = maxsize
+        self.data: OrderedDict[_.Hashable, _.Any] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self._lock = Lock()
+
+    def __getstate__(self) -> dict:
+        return {'maxsize': self.maxsize}
+
+    def __setstate__(self, state: dict) -> None:
+        vars(self).update(state)
+        self.data = OrderedDict()
+        self.hits = self.misses = 0
+        self._lock = Lock()
+
+    def get(self, key: _.Hashable, make: _.Callable[[], _.Any] | None = None) -> _.Any:
+        """The value of the key, or the value built by `make` outside the lock, or None"""
+        with self._lock:
+            if (ret := self.data.get(key)) is not None:
+                self.data.move_to_end(key)
+                self.hits += 1
+                return ret
+            self.misses += 1
+
+        if make is None:
+            return None
+
+        ret = make()
+        self.set(key, ret)
+        return ret
+
+    def set(self, key: _.Hashable, value: _.Any) -> None:
+        with self._lock:
+            self.data[key] = value
+            self.data.move_to_end(key)
+            while len(self.data) > self.maxsize:
+                self.data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self.data.clear()
+            self.hits = self.misses = 0
+
+    def info(self) -> CacheInfo:
+        return CacheInfo(self.hits, self.misses, len(self.data))
@@ -0,0 +1,36 @@
+import json
+import typing as _
+from pathlib import Path
+
+from .fingerprint import Fingerprint, document_fingerprint, library_version
+
+if _.TYPE_CHECKING:  # pragma: no cover
+    from .config import Config
+
+__all__ = ('library_version', 'config_digest', 'BuildManifest')
+
+
+def config_digest(config: 'Config', root_dir: Path | str | None = None) -> str:
+    """Digest of the configuration, the font files it references and the library version"""
+    return document_fingerprint(config, root_dir=root_dir, size=32)
+
+
+class BuildManifest:
+    """Digest of the inputs of each output, stored in a json file"""
+
+    def __init__(self, path: Path | str) -> None:
+        self.path = Path(path)
+        self.data: dict[str, str] = json.loads(self.path.read_text(encoding='utf8')) if self.path.is_file() else {}
+
+    def digest(self, source: Path | str, base: str) -> str:
+        """Digest of the markdown source combined with the `config_digest`"""
+        return Fingerprint(32).update_text(base).update_file(source).hexdigest()
+
+    def is_current(self, output: Path | str, digest: str) -> bool:
+        return Path(output).is_file() and self.data.get(str(output)) == digest
+
+    def update(self, output: Path | str, digest: str) -> None:
+        self.data[str(output)] = digest
+
+    def save(self) -> None:
+        self.path.write_text(json.dumps(self.data, indent=2, sort_keys=True), encoding='utf8')
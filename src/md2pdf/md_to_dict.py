@@ -0,0 +1,161 @@
+import re
+import typing as _
+from html import unescape
+from html.parser import HTMLParser
+from xml.etree.ElementTree import Element, TreeBuilder
+
+from markdown.util import AMP_SUBSTITUTE, HTML_PLACEHOLDER_RE
+
+if _.TYPE_CHECKING:  # pragma: no cover
+    from .parser import MarkdownTree
+
+__all__ = ('loads', 'iter_children')
+
+Render = _.Callable[[str], str]
+
+RE_AMP = re.compile(r'&(?!(?:#[0-9]+|#x[0-9a-f]+|[0-9a-z]+);)', re.I)
+RE_ONLY_PLACEHOLDERS = re.compile(rf'^(?:\s*{HTML_PLACEHOLDER_RE.pattern}\s*)+$')
+
+INLINE_TAGS = {
+    'em': 'i',
+    'strong': 'b',
+    'b': 'b',
+    'i': 'i',
+    'u': 'u',
+    'strike': 'strike',
+    'sub': 'sub',
+    'sup': 'super',
+    'code': 'font face="Courier"',
+    'a': 'a',
+    'br': 'br',
+}
+
+
+# the elements without content nor end tag in html
+VOID_TAGS = frozenset({'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link', 'meta', 'source', 'wbr'})
+
+
+class _HtmlTreeBuilder(HTMLParser):
+    """Element tree of the html, the void and unclosed tags are closed like a browser would"""
+
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=True)
+        self.builder = TreeBuilder()
+        self.open: list[str] = []
+        self.builder.start('data', {})
+
+    def handle_starttag(self, tag: str, attrs: list[tuple[str, str | None]]) -> None:
+        self.builder.start(tag, {k: v or '' for k, v in attrs})
+        if tag in VOID_TAGS:
+            self.builder.end(tag)
+        else:
+            self.open.append(tag)
+
+    def handle_startendtag(self, tag: str, attrs: list[tuple[str, str | None]]) -> None:
+        self.builder.start(tag, {k: v or '' for k, v in attrs})
+        self.builder.end(tag)
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag in self.open:
+            while (last := self.open.pop()) != tag:
+                self.builder.end(last)
+            self.builder.end(tag)
+
+    def handle_data(self, data: str) -> None:
+        self.builder.data(data)
+
+    def root(self) -> Element:
+        self.close()
+        while self.open:
+            self.builder.end(self.open.pop())
+        self.builder.end('data')
+        return self.builder.close()
+
+
+def _escape(text: str) -> str:
+    """Escape the text the same way markdown's serializer does"""
+    if '&' in text:
+        text = RE_AMP.sub('&amp;', text)
+    return text.replace('<', '&lt;').replace('>', '&gt;')
+
+
+def _restore(text: str, stash: list[str]) -> str:
+    text = HTML_PLACEHOLDER_RE.sub(lambda m: stash[int(m.group(1))], text)
+    return text.replace(AMP_SUBSTITUTE, '&')
+
+
+def _inline(element: Element, stash: list[str]) -> str:
+    tag = INLINE_TAGS.get(element.tag, element.tag)
+    name = tag.split(' ')[0]
+
+    if tag == 'a' and 'href' in element.attrib:
+        tag = f'a href="{_escape(element.attrib["href"])}"'
+
+    if name == 'br':
+        return '<br/>'
+
+    return f'<{tag}>{_value(element, stash)}</{name}>'
+
+
+def _value(element: Element, stash: list[str], skip: _.Container[Element] = ()) -> str:
+    parts = [_escape(element.text or '')]
+    for child in element:
+        if child not in skip:
+            parts.append(_inline(child, stash))
+        parts.append(_escape(child.tail or ''))
+
+    return _restore(''.join(parts), stash)
+
+
+def _is_block(element: Element) -> bool:
+    return element.tag not in INLINE_TAGS
+
+
+def _raw_elements(element: Element, stash: list[str]) -> list[Element] | None:
+    """Parse the raw html stashed by markdown when it is the only content of the element"""
+    if len(element) or not element.text or not RE_ONLY_PLACEHOLDERS.match(element.text):
+        return None
+
+    parser = _HtmlTreeBuilder()
+    parser.feed(_restore(element.text, stash))
+
+    return list(parser.root())
+
+
+def _render(value: str, render: Render | None) -> str:
+    if render and ('{{' in value or '{%' in value):
+        return unescape(render(value))
+    return value
+
+
+def _node(element: Element, value: str, children: list[dict]) -> dict:
+    return {'tag': element.tag, 'attributes': dict(element.attrib), 'value': value, 'children': children}
+
+
+def _to_dict(element: Element, stash: list[str], render: Render | None) -> dict:
+    if element.tag == 'pre':
+        code = [_node(c, _render(_value(c, stash).rstrip('\n'), render), []) for c in element]
+        return _node(element, '', code)
+
+    blocks = [c for c in element if _is_block(c)]
+    value = _render(_value(element, stash, skip=blocks).strip(), render)
+
+    return _node(element, value, list(iter_children(blocks, stash, render)))
+
+
+def iter_children(elements: _.Iterable[Element], stash: list[str], render: Render = None) -> _.Iterator[dict]:
+    for element in elements:
+        if element.tag == 'p' and (raw := _raw_elements(element, stash)) is not None:
+            yield from iter_children(raw, [], render)
+        else:
+            yield _to_dict(element, stash, render)
+
+
+def loads(tree: 'MarkdownTree', render: Render = None) -> dict:
+    """Build the same structure as `html_to_dict.loads`, generating the children on demand"""
+    return {
+        'tag': 'data',
+        'attributes': {},
+        'value': '',
+        'children': iter_children(tree.root, tree.stash, render),
+    }
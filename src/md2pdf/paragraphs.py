@@ -0,0 +1,96 @@
+import typing as _
+from copy import deepcopy
+from functools import cached_property
+
+from reportlab.lib.styles import ParagraphStyle
+from reportlab.platypus import Paragraph
+
+from .lru import LruCache
+
+__all__ = ('ParagraphCache', 'CachedParagraph')
+
+
+class ParagraphCache(LruCache):
+    """The parsed fragments of the paragraphs by text and style, and their lines by available width.
+
+    The least recently used entries are dropped after `maxsize`.
+    """
+
+    def __init__(self, maxsize: int = 4096) -> None:
+        super().__init__(maxsize)
+
+    @cached_property
+    def paragraph(self) -> type['CachedParagraph']:
+        """The paragraph class using this cache"""
+        return type('CachedParagraph', (CachedParagraph,), {'cache': self})
+
+
+class CachedParagraph(Paragraph):
+    """Paragraph sharing its parsed fragments and its line breaks with the identical paragraphs.
+
+    Same arguments as `Paragraph`, the cache is set on the class by `ParagraphCache.paragraph`.
+    The paragraphs created with `frags`, like the parts of a split, are not cached.
+    The style object is part of the key, so a style replaced in the stylesheet is not mixed with the old one.
+    """
+
+    cache: _.ClassVar[ParagraphCache | None] = None
+
+    text: str
+    frags: list
+    style: ParagraphStyle
+    bulletText: str | None
+
+    def __init__(
+        self,
+        text: str | None,
+        style: ParagraphStyle | None = None,
+        bulletText: str | None = None,
+        frags: list | None = None,
+        caseSensitive: int = 1,
+        encoding: str = 'utf8',
+    ) -> None:
+        self._key: tuple | None = None
+
+        if self.cache is None or text is None or frags is not None:
+            super().__init__(text, style, bulletText, frags, caseSensitive, encoding)
+            return
+
+        key = ('frags', text, style, bulletText, caseSensitive)
+
+        if (setup := self.cache.get(key)) is None:
+            super().__init__(text, style, bulletText, None, caseSensitive, encoding)
+            self.cache.set(key, (self.text, self.frags, self.style, self.bulletText))
+        else:
+            self.caseSensitive = caseSensitive
+            self.encoding = encoding
+            self.text, self.frags, self.style, self.bulletText = setup
+            self.debug = 0
+
+        self._key = key
+
+    def wrap(self, availWidth: float, availHeight: float) -> tuple[float, float]:
+        if self.cache is None or self._key is None:
+            return super().wrap(availWidth, availHeight)
+
+        key = ('wrap', self._key, availWidth)
+
+        if (lines := self.cache.get(key)) is not None:
+            # pylint: disable-next=attribute-defined-outside-init
+            self.width, self._wrapWidths, self.blPara, self.height = lines
+            return self.width, self.height
+
+        ret = super().wrap(availWidth, availHeight)
+        if hasattr(self, 'blPara') and self.width == availWidth:
+            self.cache.set(key, (self.width, self._wrapWidths, self.blPara, self.height))
+
+        return ret
+
+    def split(self, availWidth: float, availHeight: float) -> list[Paragraph]:
+        # reportlab changes the fragments of the lines it splits, they are copied out of the cache first
+        if self._key is not None:
+            self._key = None
+            self.frags = deepcopy(self.frags)
+            if hasattr(self, 'blPara'):
+                del self.blPara
+
+        return super().split(availWidth, availHeight)
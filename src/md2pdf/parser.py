@@ -1,21 +1,43 @@
 import typing as _
+from contextlib import contextmanager
+from hashlib import blake2b
+from threading import Lock
+from xml.etree.ElementTree import Element
 import markdown
-from jinja2 import Environment, BaseLoader, select_autoescape
+from jinja2 import Environment, BaseLoader, Template, select_autoescape
 
 from .utils import AMPERSAND, today_long, append_space, underscore, italic, bold
 
-__all__ = ('HtmlParser', 'MarkdownParser')
+if _.TYPE_CHECKING:  # pragma: no cover
+    from .cache import StageCache
+
+__all__ = ('HtmlParser', 'MarkdownParser', 'MarkdownTree')
 
 SourceType = tuple[str, _.Optional[str], _.Optional[_.Callable[[], bool]]]
 
+# in direct mode each templated block is its own template, a merge renders all of them for each record
+TEMPLATE_CACHE_SIZE = 1024
+
+
+class MarkdownTree(_.NamedTuple):
+    root: Element
+    stash: list[str]
+    headers: dict
+
 
 class Readable(_.Protocol):
     def read(self) -> str:  # pragma: no cover
         ...
 
 
-def build_env(loader: BaseLoader) -> Environment:
-    env = Environment(loader=loader, autoescape=select_autoescape(('html', 'xml')), trim_blocks=True, lstrip_blocks=True)
+def build_env(loader: BaseLoader, cache_size: int = TEMPLATE_CACHE_SIZE) -> Environment:
+    env = Environment(
+        loader=loader,
+        autoescape=select_autoescape(('html', 'xml')),
+        trim_blocks=True,
+        lstrip_blocks=True,
+        cache_size=cache_size,
+    )
     env.globals['today'] = today_long
     env.globals['space'] = append_space
     env.globals['underscore'] = underscore
@@ -36,27 +58,41 @@ class ParserLoader(BaseLoader):
 
     def get_source(self, environment: 'Environment', template: str) -> SourceType:
         source = self.source if template == self.template else ''
-        return source.replace('&', AMPERSAND), f'{template}.md', lambda: True
+
+        def uptodate() -> bool:
+            return self.template != template or self.source == source
+
+        return source.replace('&', AMPERSAND), f'{template}.md', uptodate
 
 
 class HtmlParser:
-    def __init__(self):
+    def __init__(self, cache_size: int = TEMPLATE_CACHE_SIZE):
         self.loader = ParserLoader()
-        self.env = build_env(loader=self.loader)
+        self.env = build_env(loader=self.loader, cache_size=cache_size)
+        self._lock = Lock()
 
     def __call__(self, text: str, *args, **kwargs) -> str:
         return self.parse(text, *args, **kwargs)
 
-    def parse(self, text: str, *args, **kwargs) -> str:
-        self.loader.load_source('html-parser', text)
+    def compile(self, text: str) -> Template:
+        """The templates are named after the hash of the text, so the same text is compiled only once"""
+        name = blake2b(text.encode(), digest_size=16).hexdigest()
 
-        template = self.env.get_template('html-parser')
-        return template.render(*args, **kwargs)
+        with self._lock:
+            self.loader.load_source(name, text)
+            return self.env.get_template(name)
+
+    def parse(self, text: str, *args, **kwargs) -> str:
+        return self.compile(text).render(*args, **kwargs)
 
 
 class MarkdownParser:
-    def __init__(self):
-        self.extensions = ('meta', 'attr_list', 'tables')
+    def __init__(self, pool_size: int = 4, cache: 'StageCache | None' = None):
+        self.extensions = ('meta', 'attr_list', 'tables', 'fenced_code')
+        self.pool_size = pool_size
+        self.cache = cache
+        self._pool: list[markdown.Markdown] = []
+        self._lock = Lock()
 
     def __call__(self, text: str) -> tuple[str, dict]:
         return self._parse(text)
@@ -64,12 +100,60 @@ class MarkdownParser:
     def _parse_value(self, value: list) -> _.Any:
         return value[0] if len(value) == 1 else value
 
+    @contextmanager
+    def _markdown(self) -> _.Iterator[markdown.Markdown]:
+        """Check out a prepared instance from the pool, it is reset before going back"""
+        with self._lock:
+            mk = self._pool.pop() if self._pool else None
+
+        if mk is None:
+            mk = markdown.Markdown(extensions=self.extensions)
+
+        try:
+            yield mk
+        finally:
+            mk.reset()
+            with self._lock:
+                if len(self._pool) < self.pool_size:
+                    self._pool.append(mk)
+
     def _parse(self, text: str) -> tuple[str, dict]:
-        mk = markdown.Markdown(extensions=self.extensions)
-        content = mk.convert(text)
-        headers = {k: self._parse_value(v) for k, v in mk.Meta.items()}
+        if self.cache is not None:
+            key = '\0'.join((*self.extensions, text))
+            if (cached := self.cache.get('markdown', key)) is not None:
+                return cached[0], cached[1]
+
+        with self._markdown() as mk:
+            content = mk.convert(text)
+            headers = {k: self._parse_value(v) for k, v in mk.Meta.items()}
+
+        if self.cache is not None:
+            self.cache.set('markdown', key, [content, headers])
 
         return content, headers
 
+    def _parse_tree(self, text: str) -> MarkdownTree:
+        """Run markdown up to the tree processors, skipping the serializer and post processors"""
+        with self._markdown() as mk:
+            mk.lines = text.split('\n')
+            for prep in mk.preprocessors:
+                mk.lines = prep.run(mk.lines)
+
+            root = mk.parser.parseDocument(mk.lines).getroot()
+            for processor in mk.treeprocessors:
+                if (new_root := processor.run(root)) is not None:
+                    root = new_root
+
+            headers = {k: self._parse_value(v) for k, v in mk.Meta.items()}
+            stash = [str(html) for html in mk.htmlStash.rawHtmlBlocks]
+
+        return MarkdownTree(root, stash, headers)
+
     def from_file(self, f: Readable) -> tuple[str, dict]:
         return self._parse(f.read())
+
+    def tree(self, text: str) -> MarkdownTree:
+        return self._parse_tree(text)
+
+    def tree_from_file(self, f: Readable) -> MarkdownTree:
+        return self._parse_tree(f.read())
@@ -0,0 +1,138 @@
+import typing as _
+from types import MappingProxyType
+
+from .lru import CacheInfo
+
+if _.TYPE_CHECKING:  # pragma: no cover
+    from .config import Report
+
+__all__ = ('ReportIndex', 'ResolvedElement', 'ResolveCache')
+
+AttrGetter = _.Callable[[dict, str], _.Any]
+
+
+class ReportIndex:
+    """The report rules bucketed by one of their attributes.
+
+    Only the rules in the buckets of the element, plus the rules without attributes,
+    are checked, in the order of the configuration, so the first match still wins.
+    """
+
+    KEYS = ('id', 'class', 'tag')
+
+    def __init__(self, reports: _.Iterable['Report'], default: 'Report | dict', getter: AttrGetter) -> None:
+        self.getter = getter
+        self.default = self._make_config(default)
+        self.rules: list[tuple[tuple[tuple[str, _.Any], ...], _.Mapping[str, _.Any]]] = []
+        self.buckets: dict[tuple[str, _.Any], list[int]] = {}
+        self.unindexed: list[int] = []
+        self.names: list[str] = []
+
+        for idx, report in enumerate(reports):
+            attributes = tuple((a['name'], a['value']) for a in report.attributes)
+            self.rules.append((attributes, self._make_config(report) if report else self.default))
+
+            if (key := self._make_key(attributes)) is None:
+                self.unindexed.append(idx)
+                continue
+
+            self.buckets.setdefault(key, []).append(idx)
+            if key[0] not in self.names:
+                self.names.append(key[0])
+
+    def _make_config(self, report: 'Report | dict') -> _.Mapping[str, _.Any]:
+        """Read only view of the config, the same one is returned for every element matching the rule"""
+        ret = dict(report or {})
+
+        if 'attributes' in ret:
+            del ret['attributes']
+
+        return MappingProxyType(ret)
+
+    def _make_key(self, attributes: tuple[tuple[str, _.Any], ...]) -> tuple[str, _.Any] | None:
+        if not attributes:
+            return None
+
+        by_name = dict(attributes)
+        name = next((k for k in self.KEYS if k in by_name), attributes[0][0])
+        key = (name, by_name[name])
+
+        try:
+            hash(key)
+        except TypeError:
+            return None
+
+        return key
+
+    def _candidates(self, element: dict) -> _.Iterable[int]:
+        ret = list(self.unindexed)
+
+        for name in self.names:
+            try:
+                ret.extend(self.buckets.get((name, self.getter(element, name)), ()))
+            except TypeError:
+                return range(len(self.rules))
+
+        return sorted(ret)
+
+    def lookup(self, element: dict) -> tuple[_.Mapping[str, _.Any], bool]:
+        """The config of the first rule matching all of its attributes and True, or the default and False"""
+        for idx in self._candidates(element):
+            attributes, config = self.rules[idx]
+            if all(self.getter(element, name) == value for name, value in attributes):
+                return config, True
+
+        return self.default, False
+
+    def find(self, element: dict) -> _.Mapping[str, _.Any]:
+        """The config of the first rule matching all of its attributes, or the default"""
+        return self.lookup(element)[0]
+
+
+class ResolvedElement(_.NamedTuple):
+    config: _.Mapping[str, _.Any]
+    classes: list[str]
+    key_styles: list[str]
+    # True when a report rule matched the element, False for the default config
+    matched: bool = False
+
+
+class ResolveCache:
+    """The resolved elements by signature: the tag and all the attributes of the element"""
+
+    def __init__(self) -> None:
+        self.data: dict[tuple, ResolvedElement] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def _signature(self, element: dict) -> tuple | None:
+        signature = (element.get('tag'), tuple(sorted(element.get('attributes', {}).items())))
+
+        try:
+            hash(signature)
+        except TypeError:
+            return None
+
+        return signature
+
+    def get(self, element: dict, resolve: _.Callable[[dict], ResolvedElement]) -> ResolvedElement:
+        signature = self._signature(element)
+
+        if signature is not None and (ret := self.data.get(signature)) is not None:
+            self.hits += 1
+            return ret
+
+        self.misses += 1
+        ret = resolve(element)
+
+        if signature is not None:
+            self.data[signature] = ret
+
+        return ret
+
+    def clear(self) -> None:
+        self.data.clear()
+        self.hits = self.misses = 0
+
+    def info(self) -> CacheInfo:
+        return CacheInfo(self.hits, self.misses, len(self.data))
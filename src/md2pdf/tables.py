@@ -0,0 +1,110 @@
+import re
+import typing as _
+from functools import lru_cache
+from html import unescape
+
+from reportlab.lib.fonts import tt2ps
+from reportlab.pdfbase.pdfmetrics import stringWidth
+
+__all__ = ('TableData', 'string_width', 'plain_text', 'bold_font', 'column_widths', 'table_data')
+
+RE_TAG = re.compile(r'<[^>]+>')
+
+ALIGNMENTS = {'left': 'LEFT', 'center': 'CENTER', 'right': 'RIGHT'}
+
+
+class TableData(_.NamedTuple):
+    rows: list[list[str]]
+    header_rows: int
+    # alignment of each column, LEFT, CENTER or RIGHT
+    align: list[str]
+
+
+@lru_cache(maxsize=64 * 1024)
+def string_width(text: str, font_name: str, font_size: float) -> float:
+    """`stringWidth` cached by text, font and size, the cells of a column repeat a lot"""
+    return stringWidth(text, font_name, font_size)
+
+
+def plain_text(text: str) -> str:
+    """The text without the markup, as it is printed"""
+    if '<' in text:
+        text = RE_TAG.sub('', text)
+    return unescape(text) if '&' in text else text
+
+
+@lru_cache(maxsize=256)
+def bold_font(font_name: str) -> str:
+    """The bold face of the font family, or the font itself"""
+    try:
+        return tt2ps(font_name, 1, 0)
+    except (KeyError, ValueError):
+        return font_name
+
+
+def column_widths(data: TableData, font_name: str, font_size: float, padding: float, available: float) -> list[float]:
+    """Width of each column in one pass over the cells, the widest text plus the padding.
+
+    When the table is wider than `available`, the columns wider than an even share are
+    narrowed in proportion to their width, the text of those cells wraps.
+    """
+    header_font = bold_font(font_name)
+    widths = [0.0] * max((len(r) for r in data.rows), default=0)
+
+    for index, row in enumerate(data.rows):
+        font = header_font if index < data.header_rows else font_name
+        for col, text in enumerate(row):
+            width = string_width(plain_text(text), font, font_size)
+            if width > widths[col]:
+                widths[col] = width
+
+    widths = [w + 2 * padding for w in widths]
+
+    if (total := sum(widths)) <= available or not widths:
+        return widths
+
+    share = available / len(widths)
+    narrow = sum(w for w in widths if w <= share)
+    wide = total - narrow
+    scale = (available - narrow) / wide
+
+    return [w if w <= share else w * scale for w in widths]
+
+
+def _cell_text(cell: dict) -> str:
+    value = cell.get('value', '')
+    for child in cell.get('children', []):
+        tag = {'em': 'i', 'strong': 'b'}.get(child['tag'], child['tag'])
+        value += f'<{tag}>{_cell_text(child)}</{tag}>'
+    return value
+
+
+def _cell_align(cell: dict) -> str:
+    style = cell.get('attributes', {}).get('style', '')
+    for name, align in ALIGNMENTS.items():
+        if f'text-align: {name}' in style:
+            return align
+    return 'LEFT'
+
+
+def table_data(table: dict) -> TableData:
+    """The cell texts of the `table` element, the header rows come first"""
+    rows: list[list[str]] = []
+    header_rows = 0
+    align: list[str] = []
+
+    for section in table.get('children', []):
+        trs = section.get('children', []) if section.get('tag') in ('thead', 'tbody', 'tfoot') else [section]
+
+        for tr in trs:
+            cells = tr.get('children', [])
+            rows.append([_cell_text(c) for c in cells])
+
+            if section.get('tag') == 'thead' or (cells and all(c.get('tag') == 'th' for c in cells)):
+                if len(rows) == header_rows + 1:
+                    header_rows += 1
+
+            if len(cells) > len(align):
+                align.extend(_cell_align(c) for c in cells[len(align) :])
+
+    return TableData(rows, header_rows, align)
@@ -0,0 +1,122 @@
+# pylint: disable=redefined-outer-name
+import pickle
+from pathlib import Path
+
+import pytest
+
+from md2pdf.config import loads_config
+from md2pdf.document import Md2Pdf
+
+ROOT_DIR = Path(__file__).parent
+CONFIG_FILE = ROOT_DIR / 'config.toml'
+
+
+@pytest.fixture
+def md() -> Md2Pdf:
+    return Md2Pdf().setup(loads_config(CONFIG_FILE.read_text()), ROOT_DIR / '..')
+
+
+@pytest.fixture
+def files(tmp_path) -> list[Path]:
+    ret = []
+    for idx in range(3):
+        ret.append(tmp_path / f'doc{idx}.md')
+        ret[-1].write_text(f'# Document {idx}\n\nThe paragraph.\n')
+
+    return ret
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_build_many(md, files, tmp_path, workers):
+    missing = tmp_path / 'missing.md'
+    out_dir = tmp_path / 'out'
+    out_dir.mkdir()
+
+    results = md.build_many([files[0], missing, *files[1:]], out_dir, workers=workers, title='Batch')
+
+    assert [r.source for r in results] == [files[0], missing, *files[1:]]
+    assert [r.ok for r in results] == [True, False, True, True]
+    assert results[1].error.startswith('FileNotFoundError')
+    assert all(r.seconds >= 0 for r in results)
+
+    for f in files:
+        assert (out_dir / f'{f.stem}.pdf').read_bytes().startswith(b'%PDF')
+
+
+def test_build_many_manifest(md, files, tmp_path):
+    out_dir = tmp_path / 'out'
+    out_dir.mkdir()
+    manifest = tmp_path / 'manifest.json'
+
+    results = md.build_many(files, out_dir, workers=1, manifest=manifest)
+    assert [r.skipped for r in results] == [False, False, False]
+
+    results = md.build_many(files, out_dir, workers=1, manifest=manifest)
+    assert [r.skipped for r in results] == [True, True, True]
+
+    files[1].write_text('# Changed\n')
+    (out_dir / f'{files[2].stem}.pdf').unlink()
+
+    results = md.build_many(files, out_dir, workers=1, manifest=manifest)
+    assert [r.skipped for r in results] == [True, False, False]
+    assert [r.source for r in results] == files
+
+    results = md.build_many(files, out_dir, workers=1, manifest=manifest, title='Other title')
+    assert [r.skipped for r in results] == [False, False, False]
+
+
+def test_build_many_same_name(md, files, tmp_path):
+    other = tmp_path / 'other' / files[0].name
+    other.parent.mkdir()
+    other.write_text('# Other\n')
+
+    with pytest.raises(ValueError, match='same output'):
+        md.build_many([files[0], files[1], other], tmp_path / 'out', workers=1)
+
+
+def fail_heading(_doc, _element, _resolved):
+    raise RuntimeError('heading handler')
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_build_many_settings(md, files, tmp_path, workers):
+    md.cache_paragraphs().add_tag_handler('h1', fail_heading)
+
+    results = md.build_many(files, tmp_path, workers=workers)
+
+    assert [r.error for r in results] == ['RuntimeError: heading handler'] * 3
+
+
+def test_pickle(md):
+    md.cache_paragraphs().add_tag_handler('h1', fail_heading).add_style('Custom', fontName='UbuntuMono')
+    md.stream = True
+
+    doc = pickle.loads(pickle.dumps(md.build_from_md('The paragraph.')))
+
+    assert doc.elements == [] and doc.stream and doc.paragraph_cache is not None
+    assert doc.tag_handlers['h1'] is fail_heading
+    assert doc.styles['Custom'].fontName == 'UbuntuMono'
+
+    doc.build_from_md('The paragraph.')
+    assert [e.text for e in doc.elements] == ['The paragraph.']
+
+
+def bold_value(_doc, value, _resolved):
+    return f'<b>{value}</b>'
+
+
+def test_build_many_unpicklable_handler(md, files, tmp_path):
+    md.add_class_handler('other', lambda doc, element, resolved: None)
+
+    with pytest.raises((pickle.PicklingError, AttributeError)):
+        md.build_many(files, tmp_path, workers=2)
+
+
+def test_pickle_handlers(md):
+    md.add_class_handler('skip', fail_heading).add_value_transform('bold', bold_value)
+
+    doc = pickle.loads(pickle.dumps(md))
+
+    assert doc.class_handlers['skip'] is fail_heading
+    assert doc.value_transforms['bold'] is bold_value
+    assert doc.tag_handlers == md.tag_handlers
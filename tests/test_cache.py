@@ -0,0 +1,45 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from md2pdf.cache import StageCache
+
+
+def test_get_set(tmp_path):
+    cache = StageCache(tmp_path)
+
+    assert cache.get('markdown', 'key') is None
+
+    cache.set('markdown', 'key', ['<p>text</p>', {'title': 'Title'}])
+
+    assert cache.get('markdown', 'key') == ['<p>text</p>', {'title': 'Title'}]
+    assert cache.get('dict', 'key') is None
+    assert cache.info() == (1, 2, 1)
+
+    assert StageCache(tmp_path).get('markdown', 'key') == ['<p>text</p>', {'title': 'Title'}]
+
+
+def test_evict_least_recently_used(tmp_path):
+    cache = StageCache(tmp_path, max_bytes=30)
+
+    cache.set('stage', 'first', 'a' * 10)
+    cache.set('stage', 'second', 'b' * 10)
+    os.utime(cache._path('stage', 'first'), ns=(0, 0))
+    os.utime(cache._path('stage', 'second'), ns=(10**9, 10**9))
+
+    cache.set('stage', 'third', 'c' * 10)
+
+    assert cache.get('stage', 'first') is None
+    assert cache.get('stage', 'second') == 'b' * 10
+    assert cache.get('stage', 'third') == 'c' * 10
+
+
+def test_concurrent_set(tmp_path):
+    cache = StageCache(tmp_path)
+
+    with ThreadPoolExecutor(8) as executor:
+        list(executor.map(lambda i: cache.set('stage', 'key', i), range(400)))
+        list(executor.map(lambda _i: cache.get('stage', 'key'), range(400)))
+
+    assert cache.get('stage', 'key') in range(400)
+    assert cache.info() == (401, 0, 1)
+    assert not list(tmp_path.glob('*.tmp'))
@@ -1,10 +1,12 @@
 # pylint: disable=redefined-outer-name
+import pickle
+from copy import copy
 from pathlib import Path
 
 import pytest
 
 from md2pdf import document
-from md2pdf.config import loads_config, load_config, Config
+from md2pdf.config import loads_config, load_config, camel_case_dict, Config, Style
 
 ROOT_DIR = Path(__file__).parent
 CONFIG_FILE = ROOT_DIR / 'config.toml'
@@ -140,3 +142,87 @@ def test_config_defaults_report(config):
 
     assert report.style == 'Doc1 Body'
     assert report['style'] == 'Doc1 Body'
+
+
+def test_config_cached(config):
+    assert config.fonts is config.fonts
+    assert config.styles is config.styles
+    assert config.reports is config.reports
+    assert config.reports[0].attributes is config.reports[0].attributes
+    assert config.defaults.report is config.defaults.report
+
+
+def test_config_cache_cleared_on_change(config):
+    fonts = config.fonts
+
+    config['fonts'] = config['fonts'][:1]
+
+    assert config.fonts is not fonts
+    assert len(config.fonts) == 1
+
+    del config['fonts']
+
+    assert config.fonts == ()
+
+
+@pytest.mark.parametrize(
+    'change',
+    [
+        lambda config: config.update(fonts=[]),
+        lambda config: config.__ior__({'fonts': []}),
+    ],
+    ids=['update', 'ior'],
+)
+def test_config_cache_cleared_on_update(config, change):
+    assert len(config.fonts) == 2
+
+    change(config)
+
+    assert config.fonts == ()
+
+
+def test_config_cache_nested_change(config):
+    reports = config.reports
+    report = config.defaults.report
+
+    config['reports'].append({'style': 'Doc1 Body'})
+    config['defaults']['report']['style'] = 'Doc1 Title'
+
+    assert config.reports is reports
+    assert config.defaults.report is report
+
+    config.invalidate()
+
+    assert len(config.reports) == len(reports) + 1
+    assert config.defaults.report.style == 'Doc1 Title'
+
+
+@pytest.mark.parametrize('make_copy', [copy, Config.copy])
+def test_config_cache_not_copied(config, make_copy):
+    assert len(config.fonts) == 2
+
+    other = make_copy(config)
+    other['fonts'] = []
+
+    assert other.fonts == ()
+    assert len(config.fonts) == 2
+
+
+def test_config_cache_not_pickled(config):
+    before = pickle.dumps(config)
+    _ = config.fonts, config.styles, config.reports, config.defaults
+
+    assert pickle.dumps(config) == before
+    assert pickle.loads(before).fonts == config.fonts
+
+
+def test_camel_case_dict_skips_empty():
+    style = Style(name='Doc1 Body', font_name='', font_size=10, first_line_indent='')
+
+    assert camel_case_dict(style) == {'name': 'Doc1 Body', 'fontSize': 10, 'strikeWidth': 0}
+
+
+def test_config_empty_style_values(output):
+    config = loads_config('[defaults.report]\nstyle = "Doc1 Body"\n[[styles]]\nname = "Doc1 Body"\nfont_name = ""\n')
+
+    document.Md2Pdf().setup(config).build_from_md('Some text').save(output)
@@ -1,9 +1,13 @@
 # pylint: disable=redefined-outer-name
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from threading import Event
 import pytest
 from reportlab.lib.units import mm
+from reportlab.platypus import Flowable, LongTable, Paragraph
 
-from md2pdf.document import PdfGenerator, TA_CENTER, TA_JUSTIFY
+from md2pdf.document import BuildCancelled, PdfGenerator, FRAME_WIDTH, TA_CENTER, TA_JUSTIFY
 from .expected_document import expected_create_element, expected_keep_together
 
 ROOT_DIR = Path(__file__).parent.absolute()
@@ -53,7 +57,124 @@ def test_create_elements_with_keep_together(generator, output):
     assert output.data == expected_keep_together
 
 
-# def test_create_table(generator, output):
-#     generator.add_table_style()\
-#         .append_table()\
-#         .build()
+class Gate(Flowable):
+    def __init__(self, started: Event, gate: Event) -> None:
+        super().__init__()
+        self.started = started
+        self.gate = gate
+
+    def wrap(self, *args):
+        self.started.set()
+        self.gate.wait(5)
+        return 0, 0
+
+    def draw(self):
+        pass
+
+
+class Counter(Flowable):
+    def __init__(self) -> None:
+        super().__init__()
+        self.count = 0
+
+    def wrap(self, *args):
+        self.count += 1
+        return 0, 0
+
+    def draw(self):
+        pass
+
+
+def test_build_cancelled(generator, output):
+    cancel = Event()
+    cancel.set()
+
+    with pytest.raises(BuildCancelled):
+        generator.append_paragraph('The Title', style='PDF Title').save(output, cancel=cancel)
+
+    assert output.data == b''
+
+
+def test_asave(generator, output):
+    expected = type(output)()
+    generator.append_paragraph('The Title', style='PDF Title').save(expected, name='Me', version='abc')
+
+    doc = generator.spawn().append_paragraph('The Title', style='PDF Title')
+    asyncio.run(doc.asave(output, name='Me', version='abc'))
+
+    assert output.data == expected.data
+
+
+def test_asave_cancelled(generator, output):
+    started, gate, counter = Event(), Event(), Counter()
+    generator.append_element(Gate(started, gate))
+    generator.append_element(counter)
+
+    async def cancel_save(executor):
+        task = asyncio.create_task(generator.asave(output, executor=executor))
+        await asyncio.get_running_loop().run_in_executor(None, started.wait, 5)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        gate.set()
+
+    with ThreadPoolExecutor(1) as executor:
+        asyncio.run(cancel_save(executor))
+
+    assert counter.count == 0
+    assert output.data == b''
+
+
+def test_render_bytes(generator, output):
+    generator.spawn().append_paragraph('The Title', style='PDF Title').save(output)
+    data = generator.append_paragraph('The Title', style='PDF Title').render_bytes()
+
+    assert isinstance(data, bytes)
+    assert data == output.data
+
+
+@pytest.mark.parametrize('chunk_size', [1000, 64 * 1024])
+def test_iter_chunks(generator, output, chunk_size):
+    generator.spawn().append_paragraph('The Title', style='PDF Title').save(output)
+    chunks = list(generator.append_paragraph('The Title', style='PDF Title').iter_chunks(chunk_size))
+
+    assert all(isinstance(c, memoryview) and len(c) <= chunk_size for c in chunks)
+    assert b''.join(chunks) == output.data
+
+
+def test_create_table(generator, output):
+    rows = [['Item', 'Description', 'Amount']] + [[f'Item {i}', 'word ' * (i % 40), f'{i}.00'] for i in range(200)]
+
+    generator.instrument().add_table_style('Grid', [('GRID', (0, 0), (-1, -1), 1, 'black')])
+    table = generator.build_table(rows, style='PDF Body', table_style='Grid', align=['LEFT', 'LEFT', 'RIGHT'])
+
+    generator.append_table(rows, style='PDF Body', table_style='Grid', align=['LEFT', 'LEFT', 'RIGHT']).build(output)
+
+    assert isinstance(table, LongTable)
+    assert table.repeatRows == 1
+    assert sum(table._colWidths) <= FRAME_WIDTH
+    assert table._cellvalues[1] == ['Item 0', '', '0.00']
+    assert isinstance(table._cellvalues[-1][1], Paragraph)
+    assert generator.report()['counters']['pages'] > 1
+
+
+def test_create_table_short_rows(generator, output):
+    table = generator.build_table([['Item', 'Amount'], [], ['Only item']], style='PDF Body')
+
+    assert table._cellvalues == [['Item', 'Amount'], ['', ''], ['Only item', '']]
+
+    generator.append_element(table)
+    generator.build(output)
+
+
+@pytest.mark.parametrize(
+    'rows, table_style, message',
+    [
+        ([], 'Default', 'no cell'),
+        ([[], []], 'Default', 'no cell'),
+        ([['Item']], 'Unknown', "'Unknown' does not exists"),
+    ],
+)
+def test_create_table_invalid(generator, rows, table_style, message):
+    with pytest.raises(ValueError, match=message):
+        generator.build_table(rows, style='PDF Body', table_style=table_style)
@@ -0,0 +1,70 @@
+from collections import UserDict
+from pathlib import Path
+
+import pytest
+
+from md2pdf.config import loads_config
+from md2pdf.document import PdfGenerator
+from md2pdf.fingerprint import Fingerprint, canonical, document_fingerprint, fingerprint
+
+ROOT_DIR = Path(__file__).parent
+CONFIG_FILE = ROOT_DIR / 'config.toml'
+
+
+@pytest.mark.parametrize(
+    'first, second',
+    [
+        ({'a': 1, 'b': 2}, {'b': 2, 'a': 1}),
+        ({'a': (1, 2)}, {'a': [1, 2]}),
+        (UserDict({'a': 1}), {'a': 1}),
+        ({3, 1, 2}, [1, 2, 3]),
+        (1.0, 1),
+        (Path('a/b'), 'a/b'),
+    ],
+)
+def test_canonical(first, second):
+    assert canonical(first) == canonical(second)
+
+
+def test_canonical_unknown_type():
+    with pytest.raises(TypeError):
+        canonical(object())
+
+
+@pytest.mark.parametrize('size', [4, 8, 16, 32])
+def test_fingerprint_size(size):
+    assert len(fingerprint({'a': 1}, size)) == size * 2
+
+
+def test_fingerprint_parts():
+    first = Fingerprint().update_text('ab').update_text('c')
+    second = Fingerprint().update_text('a').update_text('bc')
+
+    assert first.hexdigest() != second.hexdigest()
+
+
+def test_version():
+    config = loads_config(CONFIG_FILE.read_text())
+
+    assert PdfGenerator.version(config) == PdfGenerator.version(loads_config(CONFIG_FILE.read_text()))
+    assert len(PdfGenerator.version(config)) == 32
+    assert len(PdfGenerator.version(config, 4)) == 8
+
+    with pytest.raises(TypeError):
+        PdfGenerator.version(object())
+
+
+def test_document_fingerprint(tmp_path):
+    config = loads_config(CONFIG_FILE.read_text())
+    first = document_fingerprint(config, '# Title', ROOT_DIR / '..')
+
+    assert first == document_fingerprint(loads_config(CONFIG_FILE.read_text()), '# Title', ROOT_DIR / '..')
+    assert first != document_fingerprint(config, '# Other title', ROOT_DIR / '..')
+    assert first != document_fingerprint(config, '# Title', ROOT_DIR / '..', name='My Name')
+
+    font = next(f for f in config.fonts if f.regular)
+    copy = tmp_path / font.regular
+    copy.parent.mkdir(parents=True)
+    copy.write_bytes((ROOT_DIR / '..' / font.regular).read_bytes() + b'\0')
+
+    assert first != document_fingerprint(config, '# Title', tmp_path)
@@ -0,0 +1,83 @@
+import pytest
+from reportlab.lib.enums import TA_CENTER, TA_LEFT
+from reportlab.lib.styles import ParagraphStyle
+from reportlab.pdfbase.pdfmetrics import stringWidth
+from reportlab.platypus import Spacer
+
+from md2pdf.flowables import Blank, FlowableStream, Repeat
+
+
+class CountedSpacers:
+    def __init__(self, count: int, keep_with_next: set[int] = frozenset()) -> None:
+        self.count = count
+        self.keep_with_next = keep_with_next
+        self.pulled = 0
+
+    def __iter__(self):
+        for idx in range(self.count):
+            self.pulled += 1
+            spacer = Spacer(10, 10)
+            spacer.keepWithNext = idx in self.keep_with_next
+            yield spacer
+
+
+def test_stream_pulls_on_demand():
+    spacers = CountedSpacers(3)
+    stream = FlowableStream(spacers)
+
+    assert spacers.pulled == 0
+    assert len(stream) == 1
+    assert spacers.pulled == 1
+
+    del stream[0]
+
+    assert len(stream) == 1
+    assert spacers.pulled == 2
+
+
+def test_stream_keep_with_next_chain():
+    spacers = CountedSpacers(5, keep_with_next={0, 1})
+    stream = FlowableStream(spacers)
+
+    assert len(stream) == 3
+    assert spacers.pulled == 3
+
+
+def test_stream_keeps_order():
+    first, second, third = Spacer(1, 1), Spacer(2, 2), Spacer(3, 3)
+    stream = FlowableStream([first])
+
+    stream.feed([second])
+    stream.append(third)
+
+    assert list(stream) == [first, second, third]
+    assert len(stream) == 3
+
+
+@pytest.mark.parametrize('alignment, h_align', [(TA_LEFT, 'LEFT'), (TA_CENTER, 'CENTER')])
+def test_repeat(alignment, h_align):
+    style = ParagraphStyle('style', fontName='Helvetica', fontSize=10, leading=12, alignment=alignment)
+    repeat = Repeat('-', 20, style)
+
+    assert repeat.wrap(500, 800) == (stringWidth('-' * 20, 'Helvetica', 10), 12)
+    assert repeat.hAlign == h_align
+
+
+def test_repeat_cut_to_width():
+    style = ParagraphStyle('style', fontName='Helvetica', fontSize=10, leading=12)
+    repeat = Repeat('-', 1000, style)
+    dash = stringWidth('-', 'Helvetica', 10)
+
+    width, _height = repeat.wrap(100, 800)
+
+    assert width <= 100
+    assert repeat.text == '-' * int(100 // dash)
+
+    assert repeat.wrap(500, 800)[0] <= 500
+    assert repeat.text == '-' * int(500 // dash)
+
+
+def test_blank():
+    style = ParagraphStyle('style', leading=12)
+
+    assert Blank(3, style).wrap(500, 800) == (500, 36)
@@ -0,0 +1,85 @@
+# pylint: disable=redefined-outer-name
+import os
+import shutil
+from pathlib import Path
+
+import pytest
+from reportlab.pdfbase import pdfmetrics
+
+from md2pdf import fonts
+from md2pdf.document import PdfGenerator
+
+FONT_DIR = Path(__file__).parent / 'fonts' / 'UbuntuMono'
+
+
+class CountedTTFont(fonts.CachedTTFont):
+    created = 0
+
+    def __init__(self, *args, **kwargs) -> None:
+        CountedTTFont.created += 1
+        super().__init__(*args, **kwargs)
+
+
+@pytest.fixture
+def counted(monkeypatch) -> type[CountedTTFont]:
+    CountedTTFont.created = 0
+    monkeypatch.setattr(fonts, 'CachedTTFont', CountedTTFont)
+    return CountedTTFont
+
+
+@pytest.fixture
+def font_file(tmp_path) -> Path:
+    return Path(shutil.copy(FONT_DIR / 'UbuntuMono-Regular.ttf', tmp_path / 'font.ttf'))
+
+
+def test_register_font_once(counted, font_file):
+    assert fonts.register_font('CachedFont', font_file) is True
+    font = pdfmetrics.getFont('CachedFont')
+
+    assert fonts.register_font('CachedFont', font_file) is False
+    assert pdfmetrics.getFont('CachedFont') is font
+    assert counted.created == 1
+
+
+def test_register_font_changed_file(counted, font_file):
+    fonts.register_font('ChangedFont', font_file)
+    stat = font_file.stat()
+    os.utime(font_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+    assert fonts.register_font('ChangedFont', font_file) is True
+    assert counted.created == 2
+
+
+def test_register_font_family_once(counted):
+    faces = {
+        'normal': FONT_DIR / 'UbuntuMono-Regular.ttf',
+        'bold': FONT_DIR / 'UbuntuMono-Bold.ttf',
+        'italic': FONT_DIR / 'UbuntuMono-Italic.ttf',
+        'bold_italic': FONT_DIR / 'UbuntuMono-BoldItalic.ttf',
+    }
+
+    assert fonts.register_font_family('CachedFamily', faces) is True
+    assert fonts.register_font_family('CachedFamily', faces) is False
+    assert counted.created == 4
+    assert 'CachedFamily-BoldItalic' in pdfmetrics.getRegisteredFontNames()
+
+
+def test_subsets_reused(output):
+    def build() -> bytes:
+        out = type(output)()
+        PdfGenerator().add_font_family(
+            'UbuntuMono',
+            FONT_DIR / 'UbuntuMono-Regular.ttf',
+            FONT_DIR / 'UbuntuMono-Italic.ttf',
+            FONT_DIR / 'UbuntuMono-Bold.ttf',
+            FONT_DIR / 'UbuntuMono-BoldItalic.ttf',
+        ).add_style('Subset Body', fontName='UbuntuMono').append_paragraph('Same text', style='Subset Body').build(out)
+        return out.data
+
+    fonts.SUBSETS.clear()
+    first = build()
+    misses = fonts.SUBSETS.misses
+
+    assert misses > 0
+    assert build() == first
+    assert fonts.SUBSETS.info() == (misses, misses, misses)
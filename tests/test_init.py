@@ -0,0 +1,33 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+HEAVY = ('reportlab.platypus', 'reportlab.pdfbase.ttfonts', 'markdown', 'jinja2', 'html_to_json', 'asyncio')
+
+
+def imported_modules(code: str) -> set[str]:
+    code = f'import sys\n{code}\nprint("\\n".join(sys.modules))'
+    env = {**os.environ, 'PYTHONPATH': os.pathsep.join(sys.path)}
+    output = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True, env=env).stdout
+    return set(output.split())
+
+
+@pytest.mark.parametrize('code', ['import md2pdf', 'from md2pdf import loads_config, load_config'])
+def test_lazy_import(code):
+    assert imported_modules(code).isdisjoint(HEAVY)
+
+
+def test_import_generator():
+    modules = imported_modules('from md2pdf import Md2Pdf')
+
+    assert {'reportlab.platypus', 'markdown', 'jinja2'} <= modules
+    assert 'html_to_json' not in modules
+
+
+def test_unknown_attribute():
+    import md2pdf  # pylint: disable=import-outside-toplevel
+
+    with pytest.raises(AttributeError):
+        md2pdf.Unknown  # pylint: disable=pointless-statement
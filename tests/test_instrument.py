@@ -0,0 +1,70 @@
+import tracemalloc
+
+import pytest
+
+from md2pdf.instrument import Metrics
+
+
+def test_disabled():
+    metrics = Metrics()
+
+    with metrics.stage('stage'):
+        metrics.count('paragraphs')
+
+    assert metrics.report() == {'stages': {}, 'counters': {}}
+
+
+def test_stages():
+    metrics = Metrics(True)
+
+    for _ in range(2):
+        with metrics.stage('outer'):
+            with metrics.stage('inner'):
+                metrics.count('paragraphs', 2)
+
+    report = metrics.report()
+
+    assert report['counters'] == {'paragraphs': 4}
+    assert report['stages']['outer']['calls'] == report['stages']['inner']['calls'] == 2
+    assert report['stages']['outer']['wall'] >= report['stages']['inner']['wall']
+    assert report['stages']['outer']['memory'] is None
+
+
+def test_memory():
+    metrics = Metrics(True, trace_memory=True)
+
+    with metrics.stage('outer'):
+        with metrics.stage('inner'):
+            data = bytearray(1024 * 1024)
+        del data
+
+    assert metrics.stages['inner'].memory >= 1024 * 1024
+    assert metrics.stages['outer'].memory >= metrics.stages['inner'].memory
+    assert not tracemalloc.is_tracing()
+
+
+def test_callback():
+    reports = []
+    metrics = Metrics(True, reports.append)
+
+    with pytest.raises(ValueError):
+        with metrics.stage('stage'):
+            raise ValueError()
+
+    metrics.emit()
+    metrics.spawn().emit()
+
+    assert [r['stages']['stage']['calls'] for r in reports[:1]] == [1]
+    assert reports[1] == {'stages': {}, 'counters': {}}
+
+
+def test_memory_overlapping():
+    first = Metrics(True, trace_memory=True)
+    second = Metrics(True, trace_memory=True)
+
+    with first.stage('stage'):
+        with second.stage('stage'):
+            pass
+        assert tracemalloc.is_tracing()
+
+    assert not tracemalloc.is_tracing()
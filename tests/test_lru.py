@@ -0,0 +1,47 @@
+import pickle
+
+from md2pdf.lru import CacheInfo, LruCache
+
+
+def test_get_set():
+    cache = LruCache(maxsize=2)
+
+    assert cache.get('first') is None
+
+    cache.set('first', 1)
+    cache.set('second', 2)
+
+    assert cache.get('first') == 1
+    assert cache.info() == CacheInfo(1, 1, 2)
+
+    cache.set('third', 3)
+
+    assert list(cache.data) == ['first', 'third']
+
+
+def test_get_make():
+    cache = LruCache()
+    calls = []
+
+    def make():
+        calls.append(1)
+        return 'value'
+
+    assert cache.get('key', make) == cache.get('key', make) == 'value'
+    assert len(calls) == 1
+    assert cache.info() == CacheInfo(1, 1, 1)
+
+    cache.clear()
+
+    assert cache.info() == CacheInfo(0, 0, 0)
+
+
+def test_pickle():
+    cache = LruCache(maxsize=8)
+    cache.get('key', lambda: 'value')
+
+    other = pickle.loads(pickle.dumps(cache))
+
+    assert other.maxsize == 8
+    assert other.info() == CacheInfo(0, 0, 0)
+    assert other.get('key', lambda: 'other') == 'other'
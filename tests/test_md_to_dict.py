@@ -0,0 +1,33 @@
+import pytest
+from md2pdf import md_to_dict
+from md2pdf.parser import HtmlParser, MarkdownParser
+
+
+def node(tag: str, value: str = '', attributes: dict = None, children: list = None) -> dict:
+    return {'tag': tag, 'attributes': attributes or {}, 'value': value, 'children': children or []}
+
+
+@pytest.mark.parametrize(
+    'text, expected',
+    [
+        ('', []),
+        ('# The title {: #title .big }', [node('h1', 'The title', {'id': 'title', 'class': 'big'})]),
+        ('Some *em*, **strong** & <b>raw</b>', [node('p', 'Some <i>em</i>, <b>strong</b> &amp; <b>raw</b>')]),
+        ('<repeat char="-" times="10"></repeat>', [node('repeat', attributes={'char': '-', 'times': '10'})]),
+        ('<repeat char="-" times=10>', [node('repeat', attributes={'char': '-', 'times': '10'})]),
+        ('<hr height="5">\n<blank/>', [node('hr', attributes={'height': '5'}), node('blank')]),
+        ('* item 1\n* item 2', [node('ul', children=[node('li', 'item 1'), node('li', 'item 2')])]),
+        ('    a & <b>', [node('pre', children=[node('code', 'a &amp; &lt;b&gt;')])]),
+    ],
+)
+def test_loads(text, expected):
+    data = md_to_dict.loads(MarkdownParser().tree(text))
+
+    assert list(data['children']) == expected
+
+
+def test_loads_render():
+    tree = MarkdownParser().tree('name: The Name\n\nHello {{ name }} & co\n\nNo template')
+    data = md_to_dict.loads(tree, lambda text: HtmlParser()(text, **tree.headers))
+
+    assert list(data['children']) == [node('p', 'Hello The Name &amp; co'), node('p', 'No template')]
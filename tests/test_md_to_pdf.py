@@ -1,11 +1,16 @@
 # pylint: disable=redefined-outer-name
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from threading import Event
 
 import pytest
-from reportlab.platypus import Paragraph, ListFlowable, KeepTogether
+from reportlab.platypus import Paragraph, ListFlowable, KeepTogether, LongTable, Indenter, Preformatted, Spacer
 
+from md2pdf.cache import StageCache
 from md2pdf.config import loads_config, Config
 from md2pdf.document import Md2Pdf
+from md2pdf.flowables import Blank, Repeat
 
 ROOT_DIR = Path(__file__).parent
 CONFIG_FILE = ROOT_DIR / 'config.toml'
@@ -49,6 +54,14 @@ The paragraph:
 * item 3
 """
 
+MD_WITH_HEADERS = """\
+company: The Company
+
+# Dear {{ name }} {: #title}
+
+From {{ company }}
+"""
+
 
 class ExpectedParagraph:
     def __init__(self, text, style):
@@ -82,8 +95,9 @@ def config() -> Config:
     return loads_config(CONFIG_FILE.read_text())
 
 
-def test_generate(config):
-    doc = Md2Pdf().setup(config, ROOT_DIR / '..').build_from_md(MD)
+@pytest.mark.parametrize('direct', [False, True])
+def test_generate(config, direct):
+    doc = Md2Pdf(direct=direct).setup(config, ROOT_DIR / '..').build_from_md(MD)
     space = '&nbsp;'
     assert doc.elements == [
         ExpectedParagraph('The title', 'Doc1 Title'),
@@ -102,8 +116,9 @@ def test_generate(config):
     ]
 
 
-def test_generate_with_keep_together(config):
-    doc = Md2Pdf().setup(config, ROOT_DIR / '..').build_from_md(MD_WITH_KEEP_TOGETHER)
+@pytest.mark.parametrize('direct', [False, True])
+def test_generate_with_keep_together(config, direct):
+    doc = Md2Pdf(direct=direct).setup(config, ROOT_DIR / '..').build_from_md(MD_WITH_KEEP_TOGETHER)
 
     assert len(doc.elements) == 1
     assert isinstance(doc.elements[0], KeepTogether)
@@ -113,3 +128,402 @@ def test_generate_with_keep_together(config):
         ExpectedParagraph('The paragraph:', 'Doc1 Body'),
         ExpectedList(['item 1', 'item 2', 'item 3'], 'bullet'),
     ]
+
+
+@pytest.mark.parametrize('direct', [False, True])
+def test_build_merge(config, direct):
+    md = Md2Pdf(direct=direct).setup(config, ROOT_DIR / '..')
+    records = [{'name': 'First'}, {'name': 'Second', 'company': 'Other'}]
+
+    docs = list(md.build_merge(MD_WITH_HEADERS, records))
+
+    assert [r for r, _ in docs] == records
+    assert [d.elements for _, d in docs] == [
+        [ExpectedParagraph('Dear First', 'Doc1 Title'), ExpectedParagraph('From The Company', 'Doc1 Body')],
+        [ExpectedParagraph('Dear Second', 'Doc1 Title'), ExpectedParagraph('From Other', 'Doc1 Body')],
+    ]
+    assert all(d.styles is md.styles for _, d in docs)
+    assert md.elements == []
+
+
+@pytest.mark.parametrize('direct', [False, True])
+def test_resolve_cache(config, direct):
+    doc = Md2Pdf(direct=direct).setup(config, ROOT_DIR / '..')
+    doc.build_from_md('# Title {: #title}\n\nParagraph 1\n\nParagraph 2\n\nParagraph 3\n\n# Title 2 {: #title}')
+
+    assert doc.resolve_cache_info() == (3, 2, 2)
+    assert doc.elements == [
+        ExpectedParagraph('Title', 'Doc1 Title'),
+        ExpectedParagraph('Paragraph 1', 'Doc1 Body'),
+        ExpectedParagraph('Paragraph 2', 'Doc1 Body'),
+        ExpectedParagraph('Paragraph 3', 'Doc1 Body'),
+        ExpectedParagraph('Title 2', 'Doc1 Title'),
+    ]
+
+
+@pytest.mark.parametrize('direct', [False, True])
+def test_stream(config, output, direct):
+    streamed = type(output)()
+
+    Md2Pdf(direct=direct).setup(config, ROOT_DIR / '..').build_from_md(MD_WITH_KEEP_TOGETHER).build_from_md(MD).save(
+        output
+    )
+    doc = Md2Pdf(direct=direct, stream=True).setup(config, ROOT_DIR / '..')
+    doc.build_from_md(MD_WITH_KEEP_TOGETHER).build_from_md(MD)
+
+    assert list.__len__(doc.elements) == 0
+
+    doc.save(streamed)
+
+    assert streamed.data == output.data
+
+
+@pytest.mark.parametrize('direct', [False, True])
+def test_stage_cache(config, tmp_path, direct):
+    Md2Pdf(direct=direct, cache=StageCache(tmp_path)).setup(config, ROOT_DIR / '..').build_from_md(MD)
+    doc = Md2Pdf(direct=direct, cache=StageCache(tmp_path)).setup(config, ROOT_DIR / '..').build_from_md(MD)
+
+    assert doc.cache.info().hits == (0 if direct else 2)
+    assert [e.text for e in doc.elements if isinstance(e, Paragraph)] == [
+        'The title',
+        'left' + '&nbsp;' * 29 + 'center' + '&nbsp;' * 29 + 'right',
+        'The subtitle',
+        'The paragraph:',
+        'Formatted: <u>underscore</u>, <i>italic</i>, <b>bold</b>, <b><i>bold-italic</i></b>, <i><b>italic-bold</b></i>',
+        '<u><b><i>key:</i></b></u> value',
+    ]
+
+
+def test_build_from_template(config):
+    md = Md2Pdf().setup(config, ROOT_DIR / '..')
+    template = md.html_parser.compile('<p>Dear {{ name }}</p>')
+
+    doc = md.build_from_template(template, name='First')
+
+    assert [e.text for e in doc.elements] == ['Dear First']
+
+
+def test_stage_cache_merge(config, tmp_path):
+    cache = StageCache(tmp_path)
+    md = Md2Pdf(cache=cache).setup(config, ROOT_DIR / '..')
+
+    list(md.build_merge(MD_WITH_HEADERS, [{'name': 'First'}, {'name': 'Second'}]))
+
+    assert not list(tmp_path.glob('dict-*.json'))
+
+
+@pytest.mark.parametrize('direct', [False, True])
+def test_abuild_from_file(config, output, tmp_path, direct):
+    md_file = tmp_path / 'document.md'
+    md_file.write_text(MD)
+    expected = type(output)()
+
+    Md2Pdf(direct=direct).setup(config, ROOT_DIR / '..').build_from_file(md_file).save(expected)
+    doc = asyncio.run(Md2Pdf(direct=direct).setup(config, ROOT_DIR / '..').abuild_from_file(md_file))
+    asyncio.run(doc.asave(output))
+
+    assert output.data == expected.data
+
+
+@pytest.mark.parametrize('direct', [False, True])
+def test_abuild_from_file_cancelled(config, tmp_path, direct):
+    md_file = tmp_path / 'document.md'
+    md_file.write_text('# The title\n\nThe paragraph.\n')
+    started, gate, built = Event(), Event(), []
+
+    def wait_heading(doc, element, resolved):
+        started.set()
+        gate.wait(5)
+        return doc.build_paragraph(element['value'], resolved.config['style'])
+
+    def count_paragraph(doc, element, resolved):
+        built.append(element['value'])
+        return doc.build_paragraph(element['value'], resolved.config['style'])
+
+    doc = Md2Pdf(direct=direct).setup(config, ROOT_DIR / '..')
+    doc.add_tag_handler('h1', wait_heading).add_tag_handler('p', count_paragraph)
+
+    async def cancel_build(executor):
+        task = asyncio.create_task(doc.abuild_from_file(md_file, executor=executor))
+        await asyncio.get_running_loop().run_in_executor(None, started.wait, 5)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        gate.set()
+
+    with ThreadPoolExecutor(1) as executor:
+        asyncio.run(cancel_build(executor))
+
+    assert built == []
+    assert list(doc.elements) == []
+
+
+@pytest.mark.parametrize('direct', [False, True])
+def test_instrument(config, output, direct):
+    reports = []
+    doc = Md2Pdf(direct=direct).setup(config, ROOT_DIR / '..').instrument(reports.append)
+    doc.build_from_md(MD_WITH_KEEP_TOGETHER).save(output)
+
+    assert reports == [doc.report()]
+    assert reports[0]['counters'] == {'paragraphs': 6, 'lists': 1, 'keep_together': 1, 'pages': 1}
+    assert set(reports[0]['stages']) == (
+        {'markdown', 'flowables', 'layout'} if direct else {'markdown', 'jinja', 'html_to_dict', 'flowables', 'layout'}
+    )
+
+
+@pytest.mark.parametrize('direct', [False, True])
+def test_instrument_table_cells(config, direct):
+    md = 'Name | Description\n--- | ---\nfirst | *short*\nsecond | ' + 'long text ' * 30 + '\n'
+    doc = Md2Pdf(direct=direct).setup(config, ROOT_DIR / '..').instrument().build_from_md(md)
+
+    assert doc.report()['counters'] == {'tables': 1, 'paragraphs': 2}
+
+
+@pytest.mark.parametrize('direct', [False, True])
+def test_table(config, output, direct):
+    md = 'Name | Amount\n--- | ---:\n*first* | 1 & 2\nsecond | {{ 1 + 2 }}\n'
+    doc = Md2Pdf(direct=direct).setup(config, ROOT_DIR / '..').build_from_md(md)
+
+    assert len(doc.elements) == 1
+    table = doc.elements[0]
+    assert isinstance(table, LongTable)
+    assert table.repeatRows == 1
+    assert [[c if isinstance(c, str) else c.text for c in r] for r in table._cellvalues] == [
+        ['Name', 'Amount'],
+        ['<i>first</i>', '1 & 2'],
+        ['second', '3'],
+    ]
+
+    doc.save(output)
+
+
+@pytest.mark.parametrize('direct', [False, True])
+def test_table_empty(config, output, direct):
+    doc = Md2Pdf(direct=direct).setup(config, ROOT_DIR / '..').build_from_md('Before\n\n<table></table>\n\nAfter\n')
+
+    assert [e.text for e in doc.elements] == ['Before', 'After']
+
+    doc.save(output)
+
+
+MD_WITH_BLOCKS = """\
+1. one
+2. two
+    * nested a
+    * nested b
+        1. deep
+3. three
+
+> quote
+>
+> * q1
+
+```
+x = a < b & c
+    indented
+```
+
+after
+"""
+
+
+def list_values(flowable: ListFlowable) -> list:
+    return [f.text if isinstance(f, Paragraph) else [f[0].text, *map(list_values, f[1:])] for f in flowable._flowables]
+
+
+@pytest.mark.parametrize('direct', [False, True])
+def test_blocks(config, output, direct):
+    doc = Md2Pdf(direct=direct).setup(config, ROOT_DIR / '..').build_from_md(MD_WITH_BLOCKS)
+    ordered, indent, quote, quote_list, dedent, code, after = doc.elements
+
+    assert ordered._bulletType == '1'
+    assert list_values(ordered) == ['one', ['two', ['nested a', ['nested b', ['deep']]]], 'three']
+    assert isinstance(indent, Indenter) and isinstance(dedent, Indenter)
+    assert indent.left == -dedent.left > 0
+    assert quote == ExpectedParagraph('quote', 'Doc1 Body')
+    assert quote_list == ExpectedList(['q1'], 'bullet')
+    assert isinstance(code, Preformatted)
+    assert code.lines == ['x = a < b & c', '    indented']
+    assert code.style.fontName == 'Courier'
+    assert after == ExpectedParagraph('after', 'Doc1 Body')
+
+    doc.save(output)
+
+
+@pytest.mark.parametrize('direct', [False, True])
+def test_code_style_threads(config, direct):
+    doc = Md2Pdf(direct=direct).setup(config, ROOT_DIR / '..')
+
+    with ThreadPoolExecutor(8) as pool:
+        docs = list(pool.map(lambda _: doc.spawn().build_from_md('```\ncode\n```\n'), range(32)))
+
+    assert {d.elements[0].style.name for d in docs} == {'Doc1 Body Code'}
+
+
+def test_deep_tree(config):
+    data = leaf = {'tag': 'data', 'attributes': {}, 'value': '', 'children': []}
+    for _ in range(5000):
+        child = {'tag': 'blockquote', 'attributes': {}, 'value': '', 'children': []}
+        leaf['children'].append(child)
+        leaf = child
+    leaf['children'].append({'tag': 'p', 'attributes': {}, 'value': 'deep', 'children': []})
+
+    elements = [e for e, _ in Md2Pdf().setup(config, ROOT_DIR / '..').iter_elements(data)]
+
+    assert len(elements) == 10001
+    assert elements[5000] == ExpectedParagraph('deep', 'Doc1 Body')
+
+
+def test_deep_list(config):
+    data = {'tag': 'data', 'attributes': {}, 'value': '', 'children': []}
+    parent = data
+    for i in range(5000):
+        item = {'tag': 'li', 'attributes': {}, 'value': f'item {i}', 'children': []}
+        parent['children'].append({'tag': 'ul', 'attributes': {}, 'value': '', 'children': [item]})
+        parent = item
+
+    ((flowable, _keep),) = Md2Pdf().setup(config, ROOT_DIR / '..').iter_elements(data)
+
+    for i in range(4999):
+        ((paragraph, flowable),) = flowable._flowables
+        assert paragraph.text == f'item {i}'
+
+    assert flowable._flowables[0].text == 'item 4999'
+
+
+MD_WITH_HANDLERS = """\
+# Title {: .upper}
+
+## Skipped
+
+Text
+{: .skip}
+
+<hr height="5">
+
+key: value
+{: .key-value .upper}
+"""
+
+
+@pytest.mark.parametrize('direct', [False, True])
+def test_handlers(config, direct):
+    def upper(doc, value, resolved):
+        return value.upper()
+
+    def rule(doc, element, resolved):
+        return doc.build_spacer(0, int(element['attributes'].get('height', 1)))
+
+    doc = (
+        Md2Pdf(direct=direct)
+        .setup(config, ROOT_DIR / '..')
+        .add_tag_handler('hr', rule)
+        .add_tag_handler('h2', lambda doc, element, resolved: None)
+        .add_class_handler('skip', lambda doc, element, resolved: None)
+        .add_value_transform('upper', upper)
+        .build_from_md(MD_WITH_HANDLERS)
+    )
+
+    assert Md2Pdf().tag_handlers == Md2Pdf.TAG_HANDLERS
+    assert doc.elements[0] == ExpectedParagraph('TITLE', 'Doc1 Body')
+    assert isinstance(doc.elements[1], Spacer) and doc.elements[1].height == 5
+    assert doc.elements[2] == ExpectedParagraph('<B>KEY:</B> VALUE', 'Doc1 Body')
+    assert len(doc.elements) == 3
+
+
+MD_WITH_FORM = """\
+# Form {: #title}
+
+Name:
+
+<blank lines=2>
+
+<repeat char="-" times=40>
+
+Address:
+
+<blank lines=2>
+
+<repeat char="-" times=40></repeat>
+"""
+
+
+@pytest.mark.parametrize('direct', [False, True])
+def test_repeat_and_blank(config, output, direct):
+    doc = Md2Pdf(direct=direct).setup(config, ROOT_DIR / '..').build_from_md(MD_WITH_FORM)
+    _title, name, blank, repeat, address, blank2, repeat2 = doc.elements
+
+    assert name == ExpectedParagraph('Name:', 'Doc1 Body')
+    assert address == ExpectedParagraph('Address:', 'Doc1 Body')
+    assert isinstance(repeat, Repeat) and repeat.text == '-' * 40
+    assert isinstance(blank, Blank) and blank.height == 2 * doc.styles['Doc1 Body'].leading
+    assert repeat2 is not repeat and repeat2.text == repeat.text
+    assert blank2 is not blank and blank2.height == blank.height
+
+    doc.save(output)
+
+
+@pytest.mark.parametrize('direct', [False, True])
+@pytest.mark.parametrize(
+    'md',
+    [
+        ''.join(f'Short {i}\n\n<blank lines="13"></blank>\n\n' for i in range(60)),
+        '<repeat char="x" times="5"></repeat>\n\n' * 300,
+    ],
+    ids=['blank', 'repeat'],
+)
+def test_repeat_and_blank_many_pages(config, output, direct, md):
+    doc = Md2Pdf(direct=direct).setup(config, ROOT_DIR / '..').instrument().build_from_md(md)
+    doc.save(output)
+
+    assert doc.report()['counters']['pages'] > 2
+
+
+@pytest.mark.parametrize('direct', [False, True])
+def test_cache_paragraphs(config, output, direct):
+    cached = type(output)()
+    md = MD + '\n'.join('* the same item' for _ in range(20))
+
+    Md2Pdf(direct=direct).setup(config, ROOT_DIR / '..').build_from_md(md).save(output)
+
+    doc = Md2Pdf(direct=direct).cache_paragraphs().setup(config, ROOT_DIR / '..').build_from_md(md)
+    doc.save(cached)
+
+    assert cached.data == output.data
+    assert doc.paragraph_cache_info().hits > 0
+
+
+@pytest.mark.parametrize('direct', [False, True])
+def test_cache_paragraphs_split(config, output, direct):
+    cached = type(output)()
+    text = ' '.join(f'word{i}' for i in range(2000))
+    md = f'{text}\n\n{text}\n'
+
+    Md2Pdf(direct=direct).instrument().setup(config, ROOT_DIR / '..').build_from_md(md).save(output)
+
+    doc = Md2Pdf(direct=direct).instrument().cache_paragraphs().setup(config, ROOT_DIR / '..').build_from_md(md)
+    doc.save(cached)
+
+    assert doc.report()['counters']['pages'] > 2
+    assert cached.data == output.data
+
+
+@pytest.mark.parametrize('direct', [False, True])
+def test_build_from_files(config, output, tmp_path, direct):
+    files = []
+    for index in range(3):
+        files.append(tmp_path / f'chapter{index}.md')
+        files[-1].write_text(f'# Chapter {index}\n\n' + MD, encoding='utf8')
+
+    doc = Md2Pdf(direct=direct).setup(config, ROOT_DIR / '..').instrument().build_from_files(iter(files))
+
+    assert list.__len__(doc.elements) == 0
+
+    # the files are only read during the layout
+    files[2].write_text('# Last chapter\n\nThe end.', encoding='utf8')
+    doc.save(output)
+
+    chapter = Md2Pdf(direct=direct).setup(config, ROOT_DIR / '..').instrument().build_from_file(files[0])
+
+    assert doc.report()['counters']['pages'] == 3
+    assert doc.report()['counters']['paragraphs'] == 2 * chapter.report()['counters']['paragraphs'] + 2
@@ -0,0 +1,67 @@
+from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.platypus import Paragraph
+
+from md2pdf.lru import CacheInfo
+from md2pdf.paragraphs import CachedParagraph, ParagraphCache
+
+TEXT = 'The <b>same</b> text, long enough to be broken in a few lines when the width is narrow.'
+
+
+def test_cached_paragraph():
+    style = getSampleStyleSheet()['BodyText']
+    cache = ParagraphCache()
+
+    first = cache.paragraph(TEXT, style)
+    second = cache.paragraph(TEXT, style)
+
+    assert isinstance(second, CachedParagraph)
+    assert second.frags is first.frags
+    assert cache.info() == CacheInfo(1, 1, 1)
+
+    expected = Paragraph(TEXT, style)
+    assert first.wrap(100, 1000) == second.wrap(100, 1000) == expected.wrap(100, 1000)
+    assert second.blPara is first.blPara
+    assert cache.info() == CacheInfo(2, 2, 2)
+
+    assert second.wrap(200, 1000) == expected.wrap(200, 1000)
+    assert cache.info() == CacheInfo(2, 3, 3)
+
+
+def test_cached_paragraph_style():
+    styles = getSampleStyleSheet()
+    cache = ParagraphCache()
+
+    body = cache.paragraph(TEXT, styles['BodyText'])
+    title = cache.paragraph(TEXT, styles['Title'])
+
+    assert title.frags is not body.frags
+    assert title.style is styles['Title']
+
+
+def test_paragraph_cache_maxsize():
+    style = getSampleStyleSheet()['BodyText']
+    cache = ParagraphCache(maxsize=2)
+
+    for text in ('one', 'two', 'three', 'one'):
+        cache.paragraph(text, style)
+
+    assert cache.info() == CacheInfo(0, 4, 2)
+
+    cache.clear()
+    assert cache.info() == CacheInfo(0, 0, 0)
+
+
+def test_cached_paragraph_split():
+    style = getSampleStyleSheet()['BodyText']
+    paragraph = ParagraphCache().paragraph
+    text = ' '.join(f'word{i}' for i in range(400))
+
+    first = paragraph(text, style)
+    first.wrap(200, 1000)
+    parts = first.split(200, 300)
+
+    assert len(parts) == 2
+    assert all(isinstance(p, paragraph) for p in parts)
+
+    second = paragraph(text, style)
+    assert second.wrap(200, 1000) == Paragraph(text, style).wrap(200, 1000)
@@ -18,3 +18,32 @@ def parser() -> HtmlParser:
 )
 def test_parser(parser, text: str, headers: dict, expected: str):
     assert parser(text, **headers) == expected
+
+
+def test_parser_new_text(parser):
+    assert parser('first {{ value }}', value=1) == 'first 1'
+    assert parser('second {{ value }}', value=2) == 'second 2'
+
+
+def test_parser_compiles_once(parser):
+    template = parser.compile('same {{ value }}')
+
+    assert parser.compile('same {{ value }}') is template
+    assert parser.compile('other {{ value }}') is not template
+
+
+def test_parser_cache_size():
+    parser = HtmlParser(cache_size=2)
+    template = parser.compile('a')
+
+    parser.compile('b')
+    parser.compile('c')
+
+    assert parser.compile('a') is not template
+
+
+def test_parser_cache_many_blocks(parser):
+    texts = [f'block {i} {{{{ value }}}}' for i in range(200)]
+    templates = [parser.compile(text) for text in texts]
+
+    assert [parser.compile(text) for text in texts] == templates
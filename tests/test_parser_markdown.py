@@ -1,4 +1,5 @@
 # pylint: disable=redefined-outer-name
+from concurrent.futures import ThreadPoolExecutor
 import pytest
 from md2pdf.parser import MarkdownParser
 
@@ -53,3 +54,17 @@ def parser() -> MarkdownParser:
 def test_md_parser(parser, text, html, headers):
     assert parser.from_file(FakeFile(text)) == (html, headers)
     assert parser(text) == (html, headers)
+
+
+def test_md_parser_reuses_instance(parser):
+    assert parser(WITH_HEADERS) == (EXPECTED, {'name': 'The Name', 'organization': 'The Organization'})
+    assert parser(NO_HEADERS) == (EXPECTED, {})
+    assert len(parser._pool) == 1
+
+
+def test_md_parser_pool_concurrent(parser):
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(parser, [WITH_HEADERS, NO_HEADERS] * 20))
+
+    assert results == [(EXPECTED, {'name': 'The Name', 'organization': 'The Organization'}), (EXPECTED, {})] * 20
+    assert len(parser._pool) <= parser.pool_size
@@ -0,0 +1,93 @@
+# pylint: disable=redefined-outer-name
+import random
+from pathlib import Path
+
+import pytest
+
+from md2pdf.config import loads_config, Config, Report
+from md2pdf.reports import ReportIndex
+
+ROOT_DIR = Path(__file__).parent
+CONFIG_FILE = ROOT_DIR / 'config.toml'
+
+EMPTY = object()
+
+
+def get_attr(element: dict, name: str):
+    if name == 'tag':
+        return element[name]
+    return element['attributes'].get(name, EMPTY)
+
+
+def linear_find(reports: list[Report], default: Report, element: dict) -> dict:
+    ret = {}
+    for report in reports:
+        if all(get_attr(element, a['name']) == a['value'] for a in report.attributes):
+            ret = report
+            break
+
+    ret = dict(ret or default or {})
+    ret.pop('attributes', None)
+    return ret
+
+
+def element(tag: str, **attributes) -> dict:
+    return {'tag': tag, 'attributes': attributes}
+
+
+@pytest.fixture
+def config() -> Config:
+    return loads_config(CONFIG_FILE.read_text())
+
+
+@pytest.mark.parametrize(
+    'elem, style',
+    [
+        (element('h1', id='title'), 'Doc1 Title'),
+        (element('p', id='title2'), 'Doc2 Title'),
+        (element('h2', **{'class': 'subtitle'}), 'Doc1 subtitle'),
+        (element('h3', **{'class': 'subtitle'}), 'Doc1 Body'),
+        (element('h2', **{'class': 'subtitle other'}), 'Doc1 Body'),
+        (element('p'), 'Doc1 Body'),
+    ],
+)
+def test_find(config, elem, style):
+    index = ReportIndex(config.reports, config.defaults.report, get_attr)
+
+    assert index.find(elem) == {'style': style}
+
+
+def test_find_same_as_linear_scan():
+    rnd = random.Random(42)
+    tags, ids, classes = ['h1', 'h2', 'p', 'ul'], ['a', 'b', 'c'], ['x', 'y', 'x y']
+
+    def random_attributes():
+        pool = [('tag', rnd.choice(tags)), ('id', rnd.choice(ids)), ('class', rnd.choice(classes)), ('size', '1')]
+        return [{'name': n, 'value': v} for n, v in rnd.sample(pool, rnd.randint(0, 2))]
+
+    reports = [Report(style=f'style {i}', attributes=random_attributes()) for i in range(60)]
+    default = Report(style='default')
+    index = ReportIndex(reports, default, get_attr)
+
+    for _ in range(500):
+        attributes = {'id': rnd.choice(ids), 'class': rnd.choice(classes), 'size': rnd.choice(['1', '2'])}
+        elem = element(rnd.choice(tags), **dict(rnd.sample(sorted(attributes.items()), rnd.randint(0, 3))))
+
+        assert index.find(elem) == linear_find(reports, default, elem)
+
+
+@pytest.mark.parametrize('elem', [element('h1', id='title'), element('p')])
+def test_find_read_only(config, elem):
+    index = ReportIndex(config.reports, config.defaults.report, get_attr)
+
+    with pytest.raises(TypeError):
+        index.find(elem)['style'] = 'Other'
+
+    assert index.find(elem)['style'] != 'Other'
+
+
+def test_lookup(config):
+    index = ReportIndex(config.reports, config.defaults.report, get_attr)
+
+    assert index.lookup(element('h1', id='title')) == ({'style': 'Doc1 Title'}, True)
+    assert index.lookup(element('pre')) == ({'style': 'Doc1 Body'}, False)
@@ -0,0 +1,78 @@
+import pytest
+
+from md2pdf.tables import TableData, column_widths, plain_text, string_width, table_data
+
+
+def cell(tag: str, value: str, align: str = '', children: list | None = None) -> dict:
+    attributes = {'style': f'text-align: {align};'} if align else {}
+    return {'tag': tag, 'attributes': attributes, 'value': value, 'children': children or []}
+
+
+def row(*cells: dict) -> dict:
+    return {'tag': 'tr', 'attributes': {}, 'value': '', 'children': list(cells)}
+
+
+def section(tag: str, *rows: dict) -> dict:
+    return {'tag': tag, 'attributes': {}, 'value': '', 'children': list(rows)}
+
+
+@pytest.mark.parametrize(
+    'text, expected',
+    [
+        ('plain', 'plain'),
+        ('<b>bold</b> text', 'bold text'),
+        ('1 &amp; 2', '1 & 2'),
+    ],
+)
+def test_plain_text(text, expected):
+    assert plain_text(text) == expected
+
+
+def test_string_width():
+    string_width.cache_clear()
+
+    assert string_width('text', 'Helvetica', 10) == string_width('text', 'Helvetica', 10)
+    assert string_width.cache_info().hits == 1
+
+
+def test_table_data():
+    table = {
+        'tag': 'table',
+        'attributes': {},
+        'value': '',
+        'children': [
+            section('thead', row(cell('th', 'Name'), cell('th', 'Amount', 'right'))),
+            section(
+                'tbody',
+                row(cell('td', '', children=[cell('em', 'first')]), cell('td', '1 &amp; 2', 'right')),
+                row(cell('td', 'second'), cell('td', '3', 'right')),
+            ),
+        ],
+    }
+
+    assert table_data(table) == TableData(
+        [['Name', 'Amount'], ['<i>first</i>', '1 &amp; 2'], ['second', '3']], 1, ['LEFT', 'RIGHT']
+    )
+
+
+def test_table_data_empty_row():
+    table = {'tag': 'table', 'attributes': {}, 'value': '', 'children': [row(), row(cell('td', 'value'))]}
+
+    assert table_data(table) == TableData([[], ['value']], 0, ['LEFT'])
+
+
+def test_column_widths():
+    data = TableData([['a', 'bbbb'], ['aa', 'b']], 0, [])
+
+    assert column_widths(data, 'Helvetica', 10, 6, 1000) == [
+        string_width('aa', 'Helvetica', 10) + 12,
+        string_width('bbbb', 'Helvetica', 10) + 12,
+    ]
+
+
+def test_column_widths_narrowed():
+    data = TableData([['Name', 'word ' * 100]], 0, [])
+    widths = column_widths(data, 'Helvetica', 10, 6, 400)
+
+    assert widths[0] == string_width('Name', 'Helvetica', 10) + 12
+    assert sum(widths) == pytest.approx(400)